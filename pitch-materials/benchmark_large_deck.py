@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for large-deck mode.
+
+Builds decks of 10 to 5,000 slides by cycling through the registered slides
+(images repeat, as in a per-look appendix) with and without large-deck mode
+and prints the build time per slide. Linear scaling shows as a flat ms/slide
+column; the stock python-pptx path grows with the deck.
+
+Usage:
+    python benchmark_large_deck.py [--sizes 10,100,1000,5000] [--baseline-max 2000]
+"""
+
+from itertools import cycle, islice
+import argparse
+import os
+import tempfile
+import time
+
+from create_pitch_deck import SLIDE_BUILDERS, DeckBuilder
+
+DEFAULT_SIZES = "10,50,100,500,1000,2000,5000"
+
+
+def time_build(count, large_deck, consolidate, out_dir):
+    names = list(islice(cycle(SLIDE_BUILDERS), count))
+    builder = DeckBuilder(use_cache=False, consolidate=consolidate, large_deck=large_deck)
+    path = os.path.join(out_dir, f"bench_{count}_{int(large_deck)}.pptx")
+    start = time.perf_counter()
+    builder.build(names, path)
+    elapsed = time.perf_counter() - start
+    os.remove(path)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"comma-separated slide counts (default: {DEFAULT_SIZES})")
+    parser.add_argument("--baseline-max", type=int, default=2000,
+                        help="largest deck to also build without large-deck mode")
+    parser.add_argument("--no-consolidate", action="store_true",
+                        help="skip the shape-count reduction pass")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        for count in sizes:
+            large = time_build(count, True, not args.no_consolidate, out_dir)
+            base = (time_build(count, False, not args.no_consolidate, out_dir)
+                    if count <= args.baseline_max else None)
+            rows.append((count, large, base))
+
+    print(f"\n{'slides':>7}  {'large-deck s':>12}  {'ms/slide':>8}  {'stock s':>9}  {'ms/slide':>8}")
+    for count, large, base in rows:
+        stock = f"{base:9.2f}  {base / count * 1000:8.2f}" if base is not None else f"{'-':>9}  {'-':>8}"
+        print(f"{count:>7}  {large:12.2f}  {large / count * 1000:8.2f}  {stock}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+File helpers for the build caches under .deck_cache/.
+
+Several builds (or a build and a stamping run) can share one cache, so
+every cache file is written to a uniquely named temporary file in the same
+directory and renamed into place: readers see the old file or the new one,
+never a partial write, and two writers never share a temporary file.
+
+    with replacing(path) as tmp_path:
+        prs.save(tmp_path)
+
+Caches that grow with every build are kept under a size limit by evicting
+the least recently used files (see evict_lru).
+"""
+
+from contextlib import contextmanager
+import os
+import tempfile
+
+# mkstemp() creates files readable only by the owner; give finished files
+# the permissions open() would have.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def replacing(path):
+    """
+    Yield a fresh temporary path next to `path` and move it over `path` when
+    the block succeeds; on error the temporary file is removed instead.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def touch(path):
+    """Mark a cache file as just used, for evict_lru()."""
+    os.utime(path)
+
+
+def evict_lru(directory, max_bytes, suffix=""):
+    """
+    Delete the least recently used files ending in `suffix` from
+    `directory` until they total at most `max_bytes`. Recency is the file's
+    mtime, which touch() bumps on every cache hit. Returns the removed paths.
+    """
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith(suffix) and not entry.name.startswith("."):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    removed = []
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:   # evicted by a concurrent build
+            pass
+        total -= size
+        removed.append(path)
+    return removed
@@ -0,0 +1,850 @@
+#!/usr/bin/env python3
+"""
+Shape-count reduction pass for generated slides.
+
+Slides are drawn from many small text boxes: three per solution step, three
+or four stacked over every card rectangle. This pass folds them into fewer
+shapes without moving any text:
+
+  cards    text boxes stacked inside a plain rectangle become the rectangle's
+           own multi-paragraph text
+  rows     single-line text boxes on a shared baseline become one paragraph
+           with tab stops
+  grids    rows of text boxes with the same column edges (the solution
+           slide's number / title / description steps) become one borderless
+           table whose cells sit where the boxes were; the boxes in a row
+           can differ in size, since each cell lays out its own text
+  columns  text boxes stacked at the same left edge and width become one
+           multi-paragraph text box
+
+Text is only flowed after paragraphs with exact (spcPts) line spacing, so
+where merged lines land never depends on font metrics: exact spacing puts
+each line at the same pitch in every renderer, and the space before a moved
+paragraph is computed from those pitches. Table cells keep their box's
+top, insets and wrap width, so nothing is flowed there; a grid is only
+built when each row's text fits above the next row, so no row grows.
+
+Every slide is checked with a geometry comparison afterwards: the origin of
+each line of text in shapes and table cells (and its effective style, including what the shape's
+p:style contributes) is laid out with the same line model before and after
+the pass, and the slide is restored untouched if anything moved.
+"""
+
+from copy import deepcopy
+import math
+
+from pptx.oxml.ns import qn
+from pptx.oxml.shapes.graphfrm import CT_GraphicalObjectFrame
+from pptx.util import Pt
+
+# ── Layout model ──
+# Single line spacing is estimated as 1.2 x font size. The estimate is only
+# used for text that keeps its own frame; merges require exact spacing on
+# every paragraph that other text is flowed after (see _stack_plan).
+LINE_HEIGHT = 1.2
+# Conservative average glyph advance (fraction of font size) used to decide
+# whether a line is guaranteed not to wrap.
+GLYPH_WIDTH = 0.55
+DEFAULT_SIZE = 1800            # centipoints, PowerPoint's default run size
+EMU_PER_CENTIPOINT = 127
+TOLERANCE = Pt(0.05)           # spacing is stored in 1/100 pt, so allow rounding
+
+# Shapes whose name starts with this prefix are never merged (for example
+# text that is rewritten after the build, like stamped recipient lines).
+PINNED_PREFIX = "Pinned "
+
+_DEFAULT_INSETS = {"lIns": 91440, "tIns": 45720, "rIns": 91440, "bIns": 45720}
+_CELL_MARGINS = {"marL": 91440, "marT": 45720, "marR": 91440, "marB": 45720}
+# Built-in "No Style, No Grid" table style: no fills, borders or text styling
+_PLAIN_TABLE_STYLE = "{2D5ABB26-0587-4C30-8999-92F81FD0307C}"
+_FILLS = tuple(qn(f"a:{tag}") for tag in
+               ("noFill", "solidFill", "gradFill", "blipFill", "pattFill", "grpFill"))
+_PPR_ORDER = ("a:lnSpc", "a:spcBef", "a:spcAft", "a:buClrTx", "a:buClr", "a:buSzTx",
+              "a:buSzPct", "a:buSzPts", "a:buFontTx", "a:buFont", "a:buNone",
+              "a:buAutoNum", "a:buChar", "a:buBlip", "a:tabLst", "a:defRPr", "a:extLst")
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Shape and paragraph measurements
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _bounds(el):
+    xfrm = el.find(f"{qn('p:spPr')}/{qn('a:xfrm')}")
+    if xfrm is None:
+        xfrm = el.find(qn("p:xfrm"))
+    if xfrm is None:
+        return None
+    off, ext = xfrm.find(qn("a:off")), xfrm.find(qn("a:ext"))
+    if off is None or ext is None:
+        return None
+    x, y = int(off.get("x")), int(off.get("y"))
+    return x, y, x + int(ext.get("cx")), y + int(ext.get("cy"))
+
+
+def _set_height(el, height):
+    el.find(f"{qn('p:spPr')}/{qn('a:xfrm')}/{qn('a:ext')}").set("cy", str(height))
+
+
+def _intersects(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _contains(outer, inner):
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[2] <= outer[2] and inner[3] <= outer[3])
+
+
+def _name(el):
+    c_nv_pr = el.find(f"{qn('p:nvSpPr')}/{qn('p:cNvPr')}")
+    return c_nv_pr.get("name", "") if c_nv_pr is not None else ""
+
+
+def _is_textbox(el):
+    c_nv_sp_pr = el.find(f"{qn('p:nvSpPr')}/{qn('p:cNvSpPr')}")
+    return (el.tag == qn("p:sp") and c_nv_sp_pr is not None
+            and c_nv_sp_pr.get("txBox") == "1")
+
+
+def _body_pr(el):
+    return el.find(f"{qn('p:txBody')}/{qn('a:bodyPr')}")
+
+
+def _paragraphs(el):
+    tx_body = el.find(qn("p:txBody"))
+    return [] if tx_body is None else tx_body.findall(qn("a:p"))
+
+
+def _has_text(el):
+    return any(t.text for t in el.iter(qn("a:t")))
+
+
+def _insets(el):
+    body_pr = _body_pr(el)
+    return {k: int(body_pr.get(k, v)) if body_pr is not None else v
+            for k, v in _DEFAULT_INSETS.items()}
+
+
+def _cell_margins(tc):
+    tc_pr = tc.find(qn("a:tcPr"))
+    return {k: int(tc_pr.get(k, v)) if tc_pr is not None else v
+            for k, v in _CELL_MARGINS.items()}
+
+
+def _is_plain_frame(el):
+    """Top-anchored, horizontal, unrotated text frame."""
+    body_pr = _body_pr(el)
+    if body_pr is None or body_pr.get("anchor", "t") != "t":
+        return False
+    if body_pr.get("vert", "horz") != "horz" or body_pr.get("rot"):
+        return False
+    xfrm = el.find(f"{qn('p:spPr')}/{qn('a:xfrm')}")
+    return xfrm is not None and not xfrm.get("rot") and not xfrm.get("flipV")
+
+
+def _ppr(p):
+    return p.find(qn("a:pPr"))
+
+
+def _run_sizes(p):
+    ppr = _ppr(p)
+    default = ppr.find(qn("a:defRPr")) if ppr is not None else None
+    default_sz = int(default.get("sz", DEFAULT_SIZE)) if default is not None else DEFAULT_SIZE
+    sizes = []
+    for r in p.findall(qn("a:r")):
+        r_pr = r.find(qn("a:rPr"))
+        sizes.append(int(r_pr.get("sz")) if r_pr is not None and r_pr.get("sz") else default_sz)
+    return sizes or [default_sz]
+
+
+def _single_line(size):
+    return round(size * LINE_HEIGHT)
+
+
+def _line_height(p):
+    """Line pitch in EMU."""
+    size = max(_run_sizes(p))
+    ppr = _ppr(p)
+    ln_spc = ppr.find(qn("a:lnSpc")) if ppr is not None else None
+    if ln_spc is not None:
+        pts, pct = ln_spc.find(qn("a:spcPts")), ln_spc.find(qn("a:spcPct"))
+        if pts is not None:
+            return int(pts.get("val")) * EMU_PER_CENTIPOINT
+        if pct is not None:
+            return round(int(pct.get("val")) / 100000 * _single_line(size)) * EMU_PER_CENTIPOINT
+    return _single_line(size) * EMU_PER_CENTIPOINT
+
+
+def _font_independent(p):
+    """True if the paragraph's height doesn't depend on font metrics."""
+    ppr = _ppr(p)
+    if ppr is None or ppr.find(f"{qn('a:lnSpc')}/{qn('a:spcPts')}") is None:
+        return False
+    return all(ppr.find(f"{qn(tag)}/{qn('a:spcPct')}") is None
+               for tag in ("a:spcBef", "a:spcAft"))
+
+
+def _spacing(p, tag):
+    ppr = _ppr(p)
+    spc = ppr.find(f"{qn(tag)}/{qn('a:spcPts')}") if ppr is not None else None
+    return int(spc.get("val")) * EMU_PER_CENTIPOINT if spc is not None else 0
+
+
+def _line_count(p):
+    return 1 + len(p.findall(qn("a:br")))
+
+
+def _para_height(p):
+    return _line_count(p) * _line_height(p)
+
+
+def _wrapped_height(el, width):
+    """Estimated height of `el`'s text wrapped at `width` EMU, insets included."""
+    insets = _insets(el)
+    height = insets["tIns"] + insets["bIns"]
+    for i, p in enumerate(_paragraphs(el)):
+        advance = max(_run_sizes(p)) * GLYPH_WIDTH * EMU_PER_CENTIPOINT
+        lines = sum(max(1, math.ceil(len(line) * advance / width)) for line in _line_texts(p))
+        height += lines * _line_height(p) + _spacing(p, "a:spcAft")
+        if i:
+            height += _spacing(p, "a:spcBef")
+    return height
+
+
+def _algn(p):
+    ppr = _ppr(p)
+    return ppr.get("algn", "l") if ppr is not None else "l"
+
+
+def _effective_rpr(p, r_pr):
+    """(attributes, children) of a run after applying paragraph defaults."""
+    ppr = _ppr(p)
+    default = ppr.find(qn("a:defRPr")) if ppr is not None else None
+    attrs, children = {}, {}
+    for source in (default, r_pr):
+        if source is None:
+            continue
+        attrs.update(source.attrib)
+        for child in source:
+            children[child.tag] = child
+    return attrs, children
+
+
+def _style_key(p, r_pr):
+    attrs, children = _effective_rpr(p, r_pr)
+    attrs.pop("dirty", None)
+    attrs.pop("lang", None)
+    return (tuple(sorted(attrs.items())),
+            tuple(sorted((tag, _canonical(child)) for tag, child in children.items())),
+            _shape_font(p, children))
+
+
+def _shape_font(p, children):
+    """What the shape's p:style font reference contributes to a run with `children`."""
+    tx_body = p.getparent()
+    shape = tx_body.getparent() if tx_body is not None else None
+    font_ref = shape.find(f"{qn('p:style')}/{qn('a:fontRef')}") if shape is not None else None
+    if font_ref is None:
+        return ()
+    contributed = []
+    if qn("a:latin") not in children:
+        contributed.append(("idx", font_ref.get("idx")))
+    if not any(tag in children for tag in _FILLS):
+        contributed.extend(_canonical(child) for child in font_ref)
+    return tuple(contributed)
+
+
+def _canonical(el):
+    return (el.tag, tuple(sorted(el.attrib.items())), tuple(_canonical(c) for c in el))
+
+
+def _tab_stops(p):
+    ppr = _ppr(p)
+    tab_lst = ppr.find(qn("a:tabLst")) if ppr is not None else None
+    return [] if tab_lst is None else [int(t.get("pos")) for t in tab_lst.findall(qn("a:tab"))]
+
+
+def _fits(p, width):
+    """True if no line of `p` can wrap within `width` EMU."""
+    size = max(_run_sizes(p))
+    for line in _line_texts(p):
+        for segment in line.split("\t"):
+            if len(segment) * size * GLYPH_WIDTH * EMU_PER_CENTIPOINT > width:
+                return False
+    return True
+
+
+def _line_texts(p):
+    lines, current = [], []
+    for child in p:
+        if child.tag == qn("a:br"):
+            lines.append("".join(current))
+            current = []
+        elif child.tag in (qn("a:r"), qn("a:fld")):
+            t = child.find(qn("a:t"))
+            current.append((t.text or "") if t is not None else "")
+    lines.append("".join(current))
+    return lines
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Geometry comparison
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _frame_layout(paragraphs, top):
+    """Yield (paragraph, top) for each paragraph of a top-anchored frame."""
+    y = top
+    for i, p in enumerate(paragraphs):
+        if i:
+            y += _spacing(p, "a:spcBef")
+        yield p, y
+        y += _para_height(p) + _spacing(p, "a:spcAft")
+
+
+def _text_frames(sp_tree):
+    """
+    (paragraphs, text top, text left, wrap width) for every text frame on
+    the slide: each shape's text body and each table cell.
+    """
+    for el in sp_tree.iterchildren(qn("p:sp")):
+        if not _has_text(el) or _bounds(el) is None:
+            continue
+        left, top, right, _ = _bounds(el)
+        insets = _insets(el)
+        yield (_paragraphs(el), top + insets["tIns"], left + insets["lIns"],
+               right - insets["rIns"] - left - insets["lIns"])
+    for el in sp_tree.iterchildren(qn("p:graphicFrame")):
+        tbl = el.find(f"{qn('a:graphic')}/{qn('a:graphicData')}/{qn('a:tbl')}")
+        if tbl is None or not _has_text(tbl):
+            continue
+        left, y, _, _ = _bounds(el)
+        widths = [int(col.get("w")) for col in tbl.iterfind(f"{qn('a:tblGrid')}/{qn('a:gridCol')}")]
+        for tr in tbl.iterchildren(qn("a:tr")):
+            x = left
+            for tc, width in zip(tr.iterchildren(qn("a:tc")), widths):
+                if _has_text(tc):
+                    margins = _cell_margins(tc)
+                    yield (tc.find(qn("a:txBody")).findall(qn("a:p")), y + margins["marT"],
+                           x + margins["marL"], width - margins["marL"] - margins["marR"])
+                x += width
+            y += int(tr.get("h"))
+
+
+def text_geometry(slide):
+    """
+    Laid-out origin of every piece of text on the slide as sorted tuples of
+    (y, x, text, alignment, wrap width, run styles). Tab-separated segments
+    are separate pieces positioned at their tab stop.
+    """
+    fragments = []
+    for paragraphs, text_top, x0, wrap in _text_frames(slide.shapes._spTree):
+        for p, top in _frame_layout(paragraphs, text_top):
+            algn = _algn(p)
+            stops = _tab_stops(p)
+            line_height = _line_height(p)
+            line, segment, pieces = 0, 0, []
+
+            def flush():
+                if pieces and any(text for text, _ in pieces):
+                    x = x0 + (stops[segment - 1] if segment else 0)
+                    fragments.append((top + line * line_height, x,
+                                      "".join(text for text, _ in pieces), algn,
+                                      None if algn == "l" else wrap,
+                                      tuple(style for text, style in pieces if text)))
+                pieces.clear()
+
+            for child in p:
+                if child.tag == qn("a:br"):
+                    flush()
+                    line, segment = line + 1, 0
+                elif child.tag in (qn("a:r"), qn("a:fld")):
+                    t = child.find(qn("a:t"))
+                    style = _style_key(p, child.find(qn("a:rPr")))
+                    parts = (t.text or "").split("\t") if t is not None else [""]
+                    for i, part in enumerate(parts):
+                        if i:
+                            flush()
+                            segment += 1
+                        pieces.append((part, style))
+            flush()
+    return sorted(fragments)
+
+
+def same_geometry(before, after, tolerance=TOLERANCE):
+    if len(before) != len(after):
+        return False
+    for a, b in zip(before, after):
+        if abs(a[0] - b[0]) > tolerance or abs(a[1] - b[1]) > tolerance:
+            return False
+        if a[2:] != b[2:]:
+            return False
+    return True
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Merges
+# ──────────────────────────────────────────────────────────────────────────────
+
+def _z_clear(sp_tree, host, member, group):
+    """True if moving `member`'s text to `host`'s z-position hides or reveals nothing."""
+    children = list(sp_tree)
+    lo, hi = sorted((children.index(host), children.index(member)))
+    area = _bounds(member)
+    for el in children[lo + 1:hi]:
+        if el in group:
+            continue
+        bounds = _bounds(el)
+        if bounds is not None and _intersects(bounds, area):
+            return False
+    return True
+
+
+def _stack_plan(boxes, frame_top, host):
+    """
+    Longest prefix of `boxes` (sorted by top) that can flow as paragraphs of
+    one frame starting at `frame_top` without moving any text.
+    Returns [(box, space_before_centipoints or None)].
+    """
+    plan = []
+    first = boxes[0]
+    first_insets = _insets(first)
+    y = frame_top
+    for box in boxes:
+        insets = _insets(box)
+        if (_bounds(box)[0] != _bounds(first)[0] or _bounds(box)[2] != _bounds(first)[2]
+                or insets["lIns"] != first_insets["lIns"]
+                or insets["rIns"] != first_insets["rIns"]
+                or not _is_plain_frame(box) or not _paragraphs(box)):
+            break
+        if not _z_clear(host.getparent(), host, box, [b for b, _ in plan] + [box]):
+            break
+        space_before = None
+        if plan:
+            previous = plan[-1][0]
+            if not all(_font_independent(p) for p in _paragraphs(previous)):
+                break
+            wrap = _bounds(previous)[2] - _bounds(previous)[0] - first_insets["lIns"] - first_insets["rIns"]
+            if not all(_fits(p, wrap) for p in _paragraphs(previous)):
+                break
+            gap = _bounds(box)[1] + insets["tIns"] - y
+            if gap < 0:
+                break
+            space_before = round(gap / EMU_PER_CENTIPOINT)
+            y += space_before * EMU_PER_CENTIPOINT
+        for j, p in enumerate(_paragraphs(box)):
+            if j:
+                y += _spacing(p, "a:spcBef")
+            y += _para_height(p) + _spacing(p, "a:spcAft")
+        plan.append((box, space_before))
+    return plan
+
+
+def _set_ppr_child(p, child):
+    """Replace `child`'s tag in the paragraph properties, keeping schema order."""
+    ppr = p.get_or_add_pPr()
+    tag = child.tag.split("}")[1]
+    old = ppr.find(child.tag)
+    if old is not None:
+        ppr.remove(old)
+    ppr.insert_element_before(child, *_PPR_ORDER[_PPR_ORDER.index(f"a:{tag}") + 1:])
+
+
+def _set_spacing(p, tag, centipoints):
+    spc = p.makeelement(qn(tag), {})
+    spc.append(spc.makeelement(qn("a:spcPts"), {"val": str(centipoints)}))
+    _set_ppr_child(p, spc)
+
+
+def _flow_into(tx_body, plan):
+    """Append the planned boxes' paragraphs to `tx_body` and delete the boxes."""
+    for box, space_before in plan:
+        paragraphs = [deepcopy(p) for p in _paragraphs(box)]
+        if space_before is not None:
+            _set_spacing(paragraphs[0], "a:spcBef", space_before)
+        for p in paragraphs:
+            tx_body.append(p)
+
+
+def _is_card(el):
+    if el.tag != qn("p:sp") or _is_textbox(el) or _has_text(el):
+        return False
+    geom = el.find(f"{qn('p:spPr')}/{qn('a:prstGeom')}")
+    xfrm = el.find(f"{qn('p:spPr')}/{qn('a:xfrm')}")
+    return (geom is not None and geom.get("prst") == "rect"
+            and el.find(qn("p:txBody")) is not None
+            and xfrm is not None and not xfrm.get("rot"))
+
+
+def _mergeable(el):
+    return (_is_textbox(el) and _has_text(el)
+            and not _name(el).startswith(PINNED_PREFIX))
+
+
+def merge_cards(slide):
+    """Fold text boxes stacked inside a plain rectangle into its text frame."""
+    sp_tree = slide.shapes._spTree
+    removed = 0
+    for card in [el for el in sp_tree if _is_card(el)]:
+        area = _bounds(card)
+        children = list(sp_tree)
+        boxes = sorted((el for el in children[children.index(card) + 1:]
+                        if _mergeable(el) and _contains(area, _bounds(el))),
+                       key=lambda el: _bounds(el)[1])
+        if not boxes:
+            continue
+        first = boxes[0]
+        insets = _insets(first)
+        frame_top = _bounds(first)[1] + insets["tIns"]
+        plan = _stack_plan(boxes, frame_top, card)
+        if not plan:
+            continue
+
+        body_pr = _body_pr(card)
+        for child in list(body_pr):
+            body_pr.remove(child)
+        left, top, right, _ = _bounds(first)
+        body_pr.set("wrap", "square")
+        body_pr.set("anchor", "t")
+        body_pr.set("lIns", str(left - area[0] + insets["lIns"]))
+        body_pr.set("rIns", str(area[2] - right + insets["rIns"]))
+        body_pr.set("tIns", str(top - area[1] + insets["tIns"]))
+        tx_body = card.find(qn("p:txBody"))
+        for p in tx_body.findall(qn("a:p")):
+            tx_body.remove(p)
+        _flow_into(tx_body, plan)
+        # The runs came from text boxes with no shape style; spell out their
+        # properties and drop the card's font color so p:style can't recolor
+        # them (e.g. lt1 white on a white card).
+        for p in tx_body.findall(qn("a:p")):
+            for r in p.iterchildren(qn("a:r"), qn("a:fld")):
+                _materialize_rpr(p, r)
+        font_ref = card.find(f"{qn('p:style')}/{qn('a:fontRef')}")
+        if font_ref is not None:
+            for child in list(font_ref):
+                font_ref.remove(child)
+        for box, _ in plan:
+            sp_tree.remove(box)
+            removed += 1
+    return removed
+
+
+def merge_rows(slide):
+    """Join single-line text boxes that share a baseline into one tabbed paragraph."""
+    sp_tree = slide.shapes._spTree
+    candidates = []
+    for el in sp_tree:
+        if not _mergeable(el) or not _is_plain_frame(el):
+            continue
+        paragraphs = _paragraphs(el)
+        if len(paragraphs) != 1 or _line_count(paragraphs[0]) != 1:
+            continue
+        p = paragraphs[0]
+        if _algn(p) != "l" or _tab_stops(p) or "\t" in "".join(_line_texts(p)):
+            continue
+        if not p.findall(qn("a:r")) or p.findall(qn("a:fld")):
+            continue
+        candidates.append(el)
+
+    # Boxes share a baseline when they start at the same height with a single
+    # font size and typeface throughout.
+    groups = {}
+    for el in candidates:
+        p = _paragraphs(el)[0]
+        sizes, typefaces = set(_run_sizes(p)), set(_typefaces(p))
+        if len(sizes) != 1 or len(typefaces) != 1:
+            continue
+        key = (_bounds(el)[1], _insets(el)["tIns"], sizes.pop(), typefaces.pop(),
+               _line_height(p), _spacing(p, "a:spcAft"))
+        groups.setdefault(key, []).append(el)
+
+    removed = 0
+    for row in groups.values():
+        if len(row) < 2:
+            continue
+        row.sort(key=lambda el: _bounds(el)[0])
+        chain = [row[0]]
+        for el in row[1:]:
+            previous = chain[-1]
+            if (_bounds(el)[0] < _bounds(previous)[2]
+                    or not _z_clear(sp_tree, chain[0], el, chain + [el])):
+                if len(chain) > 1:
+                    removed += _join_row(chain)
+                chain = [el]
+                continue
+            chain.append(el)
+        if len(chain) > 1:
+            removed += _join_row(chain)
+    return removed
+
+
+def _typefaces(p):
+    for r in p.findall(qn("a:r")):
+        latin = _effective_rpr(p, r.find(qn("a:rPr")))[1].get(qn("a:latin"))
+        yield latin.get("typeface") if latin is not None else None
+
+
+def _join_row(row):
+    for el in row:
+        insets = _insets(el)
+        left, _, right, _ = _bounds(el)
+        if not _fits(_paragraphs(el)[0], right - left - insets["lIns"] - insets["rIns"]):
+            return 0
+
+    host = row[0]
+    host_p = _paragraphs(host)[0]
+    origin = _bounds(host)[0] + _insets(host)["lIns"]
+    tab_lst = host_p.makeelement(qn("a:tabLst"), {})
+    for el in row[1:]:
+        pos = _bounds(el)[0] + _insets(el)["lIns"] - origin
+        tab_lst.append(tab_lst.makeelement(qn("a:tab"), {"pos": str(pos), "algn": "l"}))
+
+    # Runs styled like the host paragraph inherit its defaults; the rest get
+    # their own paragraph's defaults copied onto the run.
+    host_style = _style_key(host_p, None)
+    segments = []
+    for el in row:
+        p = _paragraphs(el)[0]
+        runs = []
+        for r in p.findall(qn("a:r")):
+            style = _style_key(p, r.find(qn("a:rPr")))
+            r = deepcopy(r)
+            if style == host_style:
+                r_pr = r.find(qn("a:rPr"))
+                if r_pr is not None:
+                    r.remove(r_pr)
+            else:
+                _materialize_rpr(p, r)
+            runs.append(r)
+        segments.append(runs)
+
+    for r in host_p.findall(qn("a:r")):
+        host_p.remove(r)
+    end = host_p.find(qn("a:endParaRPr"))
+    for i, runs in enumerate(segments):
+        if i:
+            tab = host_p.makeelement(qn("a:r"), {})
+            tab.append(tab.makeelement(qn("a:t"), {}))
+            tab[0].text = "\t"
+            runs = [tab] + runs
+        for r in runs:
+            if end is not None:
+                end.addprevious(r)
+            else:
+                host_p.append(r)
+    _set_ppr_child(host_p, tab_lst)
+
+    right = _bounds(row[-1])[2]
+    xfrm_ext = host.find(f"{qn('p:spPr')}/{qn('a:xfrm')}/{qn('a:ext')}")
+    xfrm_ext.set("cx", str(right - _bounds(host)[0]))
+    for el in row[1:]:
+        el.getparent().remove(el)
+    return len(row) - 1
+
+
+def _materialize_rpr(p, r):
+    """Copy the paragraph's default run properties onto run `r`."""
+    attrs, children = _effective_rpr(p, r.find(qn("a:rPr")))
+    old = r.find(qn("a:rPr"))
+    ppr = _ppr(p)
+    default = ppr.find(qn("a:defRPr")) if ppr is not None else None
+    r_pr = r.makeelement(qn("a:rPr"), {})
+    for k, v in attrs.items():
+        r_pr.set(k, v)
+    # Keep schema order: children in the order the defaults declared them,
+    # followed by any the run added itself.
+    order = [c.tag for c in default] if default is not None else []
+    order += [c.tag for c in old] if old is not None else []
+    seen = set()
+    for tag in order:
+        if tag not in seen:
+            seen.add(tag)
+            r_pr.append(deepcopy(children[tag]))
+    if old is not None:
+        r.remove(old)
+    r.insert(0, r_pr)
+
+
+def _grid_cell(el):
+    """True if text box `el` lays out the same as a table cell of its width."""
+    if not _mergeable(el) or not _is_plain_frame(el) or not _paragraphs(el):
+        return False
+    body_pr = _body_pr(el)
+    return (body_pr.get("wrap", "square") == "square" and body_pr.get("numCol", "1") == "1"
+            and body_pr.find(qn("a:normAutofit")) is None)
+
+
+def merge_grids(slide):
+    """Turn rows of text boxes that line up in the same columns into one table."""
+    sp_tree = slide.shapes._spTree
+    rows = {}
+    for el in sp_tree:
+        if _grid_cell(el):
+            rows.setdefault(_bounds(el)[1], []).append(el)
+
+    # Rows of two or more side-by-side boxes, keyed by their column edges
+    layouts = []
+    for top in sorted(rows):
+        row = sorted(rows[top], key=lambda el: _bounds(el)[0])
+        columns = tuple((_bounds(el)[0], _bounds(el)[2]) for el in row)
+        if len(row) > 1 and all(a[1] <= b[0] for a, b in zip(columns, columns[1:])):
+            layouts.append((columns, row))
+
+    removed = 0
+    start = 0
+    while start < len(layouts):
+        end = start + 1
+        while end < len(layouts) and layouts[end][0] == layouts[start][0]:
+            end += 1
+        grid = [row for _, row in layouts[start:end]]
+        if len(grid) > 1 and _grid_fits(sp_tree, grid):
+            removed += _make_table(sp_tree, grid)
+        start = end
+    return removed
+
+
+def _grid_fits(sp_tree, grid):
+    """
+    True if every box's text fits above the next row, so no table row grows
+    and pushes the rows below it down, and the table can take the z-position
+    of the first box.
+    """
+    for row, below in zip(grid, grid[1:]):
+        pitch = _bounds(below[0])[1] - _bounds(row[0])[1]
+        for el in row:
+            left, _, right, _ = _bounds(el)
+            insets = _insets(el)
+            if _wrapped_height(el, right - left - insets["lIns"] - insets["rIns"]) > pitch:
+                return False
+    members = [el for row in grid for el in row]
+    host = min(members, key=list(sp_tree).index)
+    return all(_z_clear(sp_tree, host, el, members) for el in members)
+
+
+def _make_table(sp_tree, grid):
+    """
+    Replace the boxes in `grid` with a borderless table whose cells sit
+    exactly where the boxes were. Gaps between columns become empty spacer
+    columns, so each cell keeps its box's width and wraps the same way.
+    """
+    members = [el for row in grid for el in row]
+    host = min(members, key=list(sp_tree).index)
+    columns = [(_bounds(el)[0], _bounds(el)[2]) for el in grid[0]]
+    grid_cols = []  # (width, box column or None for a spacer)
+    for k, (left, right) in enumerate(columns):
+        if k and left > columns[k - 1][1]:
+            grid_cols.append((left - columns[k - 1][1], None))
+        grid_cols.append((right - left, k))
+    tops = [_bounds(row[0])[1] for row in grid]
+    last = grid[-1]
+    heights = [below - top for top, below in zip(tops, tops[1:])]
+    heights.append(max(max(_bounds(el)[3] - tops[-1],
+                           _wrapped_height(el, _bounds(el)[2] - _bounds(el)[0]
+                                           - _insets(el)["lIns"] - _insets(el)["rIns"]))
+                       for el in last))
+
+    shape_id = int(host.find(f"{qn('p:nvSpPr')}/{qn('p:cNvPr')}").get("id"))
+    frame = CT_GraphicalObjectFrame.new_table_graphicFrame(
+        shape_id, f"Table {shape_id - 1}", len(grid), len(grid_cols),
+        columns[0][0], tops[0], sum(width for width, _ in grid_cols), sum(heights))
+    tbl = frame.find(f"{qn('a:graphic')}/{qn('a:graphicData')}/{qn('a:tbl')}")
+    tbl_pr = tbl.find(qn("a:tblPr"))
+    tbl_pr.attrib.clear()
+    tbl_pr.find(qn("a:tableStyleId")).text = _PLAIN_TABLE_STYLE
+    for col, (width, _) in zip(tbl.iterfind(f"{qn('a:tblGrid')}/{qn('a:gridCol')}"), grid_cols):
+        col.set("w", str(width))
+    for tr, row, height in zip(tbl.iterchildren(qn("a:tr")), grid, heights):
+        tr.set("h", str(height))
+        for tc, (_, k) in zip(tr.iterchildren(qn("a:tc")), grid_cols):
+            _fill_cell(tc, row[k] if k is not None else None)
+
+    host.addprevious(frame)
+    for el in members:
+        sp_tree.remove(el)
+    return len(members) - 1
+
+
+def _fill_cell(tc, box):
+    """Give table cell `tc` the text and insets of text box `box` (None: leave empty)."""
+    tx_body = tc.find(qn("a:txBody"))
+    for p in tx_body.findall(qn("a:p")):
+        tx_body.remove(p)
+    if box is None:
+        margins = dict.fromkeys(_CELL_MARGINS, 0)
+        p = tx_body.makeelement(qn("a:p"), {})
+        p.append(p.makeelement(qn("a:endParaRPr"), {"sz": "100"}))
+        tx_body.append(p)
+    else:
+        insets = _insets(box)
+        margins = {"marL": insets["lIns"], "marT": insets["tIns"],
+                   "marR": insets["rIns"], "marB": insets["bIns"]}
+        lst_style = box.find(f"{qn('p:txBody')}/{qn('a:lstStyle')}")
+        if lst_style is not None:
+            tx_body.replace(tx_body.find(qn("a:lstStyle")), deepcopy(lst_style))
+        for p in _paragraphs(box):
+            p = deepcopy(p)
+            tx_body.append(p)
+            # Spell out the run properties so the table's text defaults can't apply
+            for r in p.iterchildren(qn("a:r"), qn("a:fld")):
+                _materialize_rpr(p, r)
+
+    tc_pr = tc.find(qn("a:tcPr"))
+    for name, value in margins.items():
+        tc_pr.set(name, str(value))
+    tc_pr.set("anchor", "t")
+    for tag in ("a:lnL", "a:lnR", "a:lnT", "a:lnB"):
+        ln = tc_pr.makeelement(qn(tag), {"w": "0"})
+        ln.append(ln.makeelement(qn("a:noFill"), {}))
+        tc_pr.append(ln)
+    tc_pr.append(tc_pr.makeelement(qn("a:noFill"), {}))
+
+
+def merge_columns(slide):
+    """Fold text boxes stacked at the same left edge and width into one box."""
+    sp_tree = slide.shapes._spTree
+    columns = {}
+    for el in sp_tree:
+        if _mergeable(el):
+            left, _, right, _ = _bounds(el)
+            columns.setdefault((left, right), []).append(el)
+
+    removed = 0
+    for column in columns.values():
+        column.sort(key=lambda el: _bounds(el)[1])
+        while len(column) > 1:
+            host = column[0]
+            frame_top = _bounds(host)[1] + _insets(host)["tIns"]
+            plan = _stack_plan(column, frame_top, host)
+            if len(plan) > 1:
+                _flow_into(host.find(qn("p:txBody")), plan[1:])
+                _set_height(host, _bounds(plan[-1][0])[3] - _bounds(host)[1])
+                for box, _ in plan[1:]:
+                    sp_tree.remove(box)
+                    removed += 1
+            column = column[max(len(plan), 1):]
+    return removed
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Pass
+# ──────────────────────────────────────────────────────────────────────────────
+
+def consolidate_slide(slide):
+    """
+    Run the card, row and column merges on one slide. Returns the number of
+    shapes removed; the slide is restored if the text geometry changed.
+    """
+    sp_tree = slide.shapes._spTree
+    before = text_geometry(slide)
+    snapshot = [deepcopy(el) for el in sp_tree]
+    removed = (merge_cards(slide) + merge_rows(slide) + merge_grids(slide)
+               + merge_columns(slide))
+    if removed and not same_geometry(before, text_geometry(slide)):
+        for el in list(sp_tree):
+            sp_tree.remove(el)
+        for el in snapshot:
+            sp_tree.append(el)
+        return 0
+    return removed
+
+
+def consolidate_deck(prs):
+    return sum(consolidate_slide(slide) for slide in prs.slides)
@@ -10,7 +10,28 @@ from pptx.util import Inches, Pt, Emu
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from lxml import etree
+from datetime import datetime, timezone
+import argparse
+import hashlib
+import io
+import json
 import os
+import shutil
+import sys
+import zipfile
+import zlib
+import pptx
+
+from cache_files import evict_lru, replacing, touch
+from consolidate_shapes import PINNED_PREFIX, consolidate_deck
+from deck_zip import ZIP_EPOCH
+from image_source import S3AccessError, image_source_from_env
+from large_deck import LargeDeck
+from speaker_notes import (add_notes_slide, load_speaker_notes, notes_digest,
+                           notes_partname, notes_record, patch_notes, prune_notes_records,
+                           store_notes_record)
 
 # ── Brand Colors ──
 CORAL       = RGBColor(0xE8, 0x5D, 0x4C)   # #E85D4C — Decision Coral
@@ -26,11 +47,223 @@ SLIDE_WIDTH  = Inches(13.333)
 SLIDE_HEIGHT = Inches(7.5)
 
 # ── Image paths (extracted from reference deck) ──
+# Local copies; when an S3 bucket is configured (see image_source.py) they
+# are only the fallback for images the bucket can't serve in time.
 IMG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "extracted_images")
 
-def img(filename):
-    path = os.path.join(IMG_DIR, filename)
-    return path if os.path.exists(path) else None
+
+# ── Base template (built once, cached on disk) ──
+# Bump TEMPLATE_VERSION whenever build_base_template() changes so stale
+# cached templates are rebuilt instead of reused.
+TEMPLATE_VERSION = 1
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".deck_cache")
+TEMPLATE_PATH = os.path.join(CACHE_DIR, f"base_template_v{TEMPLATE_VERSION}.pptx")
+IMAGE_CACHE_DIR = os.path.join(CACHE_DIR, "images")
+NOTES_CACHE_DIR = os.path.join(CACHE_DIR, "notes")
+
+THEME_COLORS = {
+    "dk1":     BLACK,
+    "lt1":     WHITE,
+    "dk2":     CHARCOAL,
+    "lt2":     CREAM,
+    "accent1": CORAL,
+    "accent2": GRAY,
+    "accent3": DIVIDER,
+}
+THEME_FONTS = {
+    "majorFont": "Playfair Display",
+    "minorFont": "DM Sans",
+}
+
+_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+
+
+def _brand_theme(blob):
+    """Rewrite the default Office theme XML with brand colors and fonts."""
+    theme = etree.fromstring(blob)
+    theme.set("name", "Or This?")
+    clr_scheme = theme.find(f"{{{_A}}}themeElements/{{{_A}}}clrScheme")
+    clr_scheme.set("name", "Or This?")
+    for slot, color in THEME_COLORS.items():
+        el = clr_scheme.find(f"{{{_A}}}{slot}")
+        for child in list(el):
+            el.remove(child)
+        etree.SubElement(el, f"{{{_A}}}srgbClr", val=str(color))
+
+    font_scheme = theme.find(f"{{{_A}}}themeElements/{{{_A}}}fontScheme")
+    font_scheme.set("name", "Or This?")
+    for slot, typeface in THEME_FONTS.items():
+        font = font_scheme.find(f"{{{_A}}}{slot}")
+        font.find(f"{{{_A}}}latin").set("typeface", typeface)
+        # Per-script fallbacks are never used by this deck
+        for script_font in font.findall(f"{{{_A}}}font"):
+            font.remove(script_font)
+    return etree.tostring(theme, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _strip_placeholders(shapes):
+    for shape in list(shapes):
+        if shape.is_placeholder:
+            shape._element.getparent().remove(shape._element)
+
+
+def build_base_template(path=TEMPLATE_PATH):
+    """
+    Build the minimal 16:9 base template: one master, only the Blank layout,
+    brand theme colors/fonts, no placeholders, thumbnail or printer settings.
+    """
+    prs = Presentation()
+    prs.slide_width = SLIDE_WIDTH
+    prs.slide_height = SLIDE_HEIGHT
+
+    blank = prs.slide_layouts.get_by_name("Blank")
+    for layout in list(prs.slide_layouts):
+        if layout is not blank:
+            prs.slide_layouts.remove(layout)
+    _strip_placeholders(blank.shapes)
+
+    master = prs.slide_master
+    _strip_placeholders(master.shapes)
+    theme_part = master.part.part_related_by(RT.THEME)
+    theme_part.blob = _brand_theme(theme_part.blob)
+
+    # Parts that are only reachable through a relationship are dropped on save
+    for rId, rel in list(prs.part.rels.items()):
+        if rel.reltype == RT.PRINTER_SETTINGS:
+            prs.part.drop_rel(rId)
+    package = prs.part.package
+    for rId, rel in list(package._rels.items()):
+        if rel.reltype == RT.THUMBNAIL:
+            package.drop_rel(rId)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with replacing(path) as tmp_path:
+        prs.save(tmp_path)
+    return path
+
+
+def base_template():
+    """Path to the cached base template, building it on first use."""
+    if not os.path.exists(TEMPLATE_PATH):
+        build_base_template(TEMPLATE_PATH)
+    return TEMPLATE_PATH
+
+
+# ── Reproducible output + whole-deck cache ──
+# Identical inputs produce byte-identical decks, so a finished deck can be
+# looked up by the hash of everything that went into it. The least recently
+# used decks are evicted once the cache passes PITCH_DECK_CACHE_MB.
+OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "OrThis_Seed_Pitch_Deck.pptx")
+DECK_CACHE_DIR = os.path.join(CACHE_DIR, "decks")
+DECK_CACHE_VERSION = 1
+DECK_CACHE_MAX_BYTES = int(os.environ.get("PITCH_DECK_CACHE_MB", "512")) << 20
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+NOTES_PATH = os.path.join(SOURCE_DIR, "Speaker_Notes.md")
+
+
+def deck_epoch():
+    """Creation/modified timestamp for core properties; honors SOURCE_DATE_EPOCH."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), tz=timezone.utc).replace(tzinfo=None)
+    return datetime(2026, 1, 1)
+
+
+def normalized_core_properties(overrides=None):
+    props = {
+        "title":            "Or This? — Seed Pitch Deck",
+        "subject":          "",
+        "author":           "Or This?",
+        "last_modified_by": "Or This?",
+        "comments":         "",
+        "keywords":         "",
+        "category":         "",
+        "revision":         1,
+        "created":          deck_epoch(),
+        "modified":         deck_epoch(),
+    }
+    props.update(overrides or {})
+    return props
+
+
+def apply_core_properties(prs, props):
+    core = prs.core_properties
+    for name, value in props.items():
+        setattr(core, name, value)
+
+
+def save_deterministic(prs, path):
+    """
+    Save `prs` with fixed member timestamps/attributes so identical
+    presentations serialize to identical bytes. Part order is python-pptx's
+    relationship walk, which is already stable for a given build.
+    """
+    buf = io.BytesIO()
+    prs.save(buf)
+    with replacing(path) as tmp_path, zipfile.ZipFile(buf) as src, \
+            zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            member = zipfile.ZipInfo(info.filename, date_time=ZIP_EPOCH)
+            member.compress_type = zipfile.ZIP_DEFLATED
+            member.create_system = 0
+            member.external_attr = 0
+            dst.writestr(member, src.read(info))
+    return path
+
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def deck_cache_key(overrides, images):
+    """
+    sha256 over every input of a build: generator source, base template
+    version, overrides, the bytes of the resolved `images` ({name: path or
+    None}), and the library versions that shape the serialized output.
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps({
+        "cache_version":    DECK_CACHE_VERSION,
+        "template_version": TEMPLATE_VERSION,
+        "python_pptx":      pptx.__version__,
+        "lxml":             etree.__version__,
+        "zlib":             zlib.ZLIB_RUNTIME_VERSION,
+        "python":           sys.version_info[:2],
+        "overrides":        overrides,
+    }, sort_keys=True, default=str).encode())
+    for name in sorted(os.listdir(SOURCE_DIR)):
+        if name.endswith(".py"):
+            h.update(name.encode())
+            h.update(_file_digest(os.path.join(SOURCE_DIR, name)).encode())
+    for name, path in sorted(images.items()):
+        h.update(name.encode())
+        h.update(_file_digest(path).encode() if path else b"placeholder")
+    return h.hexdigest()
+
+
+def cached_deck(key):
+    path = os.path.join(DECK_CACHE_DIR, key + ".pptx")
+    try:
+        touch(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def store_cached_deck(key, path):
+    os.makedirs(DECK_CACHE_DIR, exist_ok=True)
+    cache_path = os.path.join(DECK_CACHE_DIR, key + ".pptx")
+    with replacing(cache_path) as tmp_path:
+        shutil.copyfile(path, tmp_path)
+    if evict_lru(DECK_CACHE_DIR, DECK_CACHE_MAX_BYTES, ".pptx"):
+        prune_notes_records(DECK_CACHE_DIR)
+    return cache_path
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -152,24 +385,51 @@ def card_divider(slide, left, top, width, color=DIVIDER):
     add_shape(slide, left, top, width, Inches(0.014), color)
 
 
+# ── Per-recipient confidentiality footer (title + closing slides) ──
+def tracking_footer(slide, tracking):
+    tb = add_text_box(slide, Inches(6.5), Inches(7.0), Inches(6.0), Inches(0.3),
+                      f"Confidential  \u2022  {tracking}",
+                      font_size=9, font_color=GRAY, font_name="DM Sans")
+    # Stamped after the build, so it must stay its own shape
+    tb.name = PINNED_PREFIX + "Tracking"
+
+
 # ──────────────────────────────────────────────────────────────────────────────
-# Slide builders
+# Slide registry
 # ──────────────────────────────────────────────────────────────────────────────
 
-def build_deck():
-    prs = Presentation()
-    prs.slide_width = SLIDE_WIDTH
-    prs.slide_height = SLIDE_HEIGHT
-    blank = prs.slide_layouts[6]
+# name -> builder(slide, deck); registration order is the default deck order
+SLIDE_BUILDERS = {}
+# name -> image filenames the builder passes to deck.img(), fetched up front
+SLIDE_IMAGES = {}
+# name -> "## Slide N: <title>" section of Speaker_Notes.md holding its notes
+SLIDE_NOTES = {}
+
+
+def register_slide(name, images=(), notes=None):
+    def decorator(builder):
+        if name in SLIDE_BUILDERS:
+            raise ValueError(f"Slide {name!r} is already registered")
+        SLIDE_BUILDERS[name] = builder
+        SLIDE_IMAGES[name] = tuple(images)
+        SLIDE_NOTES[name] = notes
+        return builder
+    return decorator
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Slide builders
+# ──────────────────────────────────────────────────────────────────────────────
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 1: TITLE  — white bg, left half image, right text
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+# ══════════════════════════════════════════════════════════════
+# SLIDE 1: TITLE  — white bg, left half image, right text
+# ══════════════════════════════════════════════════════════════
+@register_slide("title", images=["slide1_Picture 1.jpg"], notes="Title")
+def title_slide(slide, deck):
     set_slide_bg(slide, WHITE)
 
     # Left half — fashion photo panel
-    add_picture(slide, img("slide1_Picture 1.jpg"),
+    add_picture(slide, deck.img("slide1_Picture 1.jpg"),
                 Inches(0), Inches(0), Inches(5.5), Inches(7.5))
 
     # Right side — coral rule above the logo
@@ -199,14 +459,24 @@ def build_deck():
                  "Seed Stage  \u2022  2026",
                  font_size=13, font_color=GRAY, font_name="DM Sans")
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 2: THE PROBLEM  — white bg, left text, right inset photo
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+    if deck.recipient:
+        tb = add_text_box(slide, Inches(6.5), Inches(6.4), Inches(6.0), Inches(0.4),
+                          f"Prepared for {deck.recipient}",
+                          font_size=13, font_color=CORAL, font_name="DM Sans")
+        tb.name = PINNED_PREFIX + "Recipient"
+    if deck.tracking:
+        tracking_footer(slide, deck.tracking)
+
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 2: THE PROBLEM  — white bg, left text, right inset photo
+# ══════════════════════════════════════════════════════════════
+@register_slide("problem", images=["slide2_Picture 6.jpg"], notes="The Problem")
+def problem_slide(slide, deck):
     set_slide_bg(slide, WHITE)
 
     # Right inset photo
-    add_picture(slide, img("slide2_Picture 6.jpg"),
+    add_picture(slide, deck.img("slide2_Picture 6.jpg"),
                 Inches(8.8), Inches(0.8), Inches(4.2), Inches(6.2))
 
     # Section label
@@ -235,13 +505,15 @@ def build_deck():
                  "\u2014 \u201cI just want someone honest to tell me if this works.\u201d",
                  font_size=17, font_color=CHARCOAL, font_name="Playfair Display")
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 3: THE SOLUTION  — white bg, left half image, right steps
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 3: THE SOLUTION  — white bg, left half image, right steps
+# ══════════════════════════════════════════════════════════════
+@register_slide("solution", images=["slide3_Picture 1.jpg"], notes="The Solution — Three Pillars")
+def solution_slide(slide, deck):
     set_slide_bg(slide, WHITE)
 
-    add_picture(slide, img("slide3_Picture 1.jpg"),
+    add_picture(slide, deck.img("slide3_Picture 1.jpg"),
                 Inches(0), Inches(0), Inches(5.5), Inches(7.5))
 
     add_text_box(slide, Inches(6.2), Inches(0.5), Inches(5.0), Inches(0.4),
@@ -275,13 +547,15 @@ def build_deck():
                  "Not a tool you open. A platform that works for you.",
                  font_size=15, font_color=CHARCOAL, font_name="Playfair Display")
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 4: THE AI  — dark bg, left half image, right bullets
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 4: THE AI  — dark bg, left half image, right bullets
+# ══════════════════════════════════════════════════════════════
+@register_slide("ai", images=["slide4_Picture 1.jpg"], notes="The Agentic Architecture")
+def ai_slide(slide, deck):
     set_slide_bg(slide, BLACK)
 
-    add_picture(slide, img("slide4_Picture 1.jpg"),
+    add_picture(slide, deck.img("slide4_Picture 1.jpg"),
                 Inches(0), Inches(0), Inches(5.5), Inches(7.5))
 
     add_text_box(slide, Inches(6.2), Inches(0.5), Inches(5.0), Inches(0.4),
@@ -317,13 +591,15 @@ def build_deck():
                  "16 autonomous agents  \u2022  Self-calibrating quality  \u2022  Prompt v3.0",
                  font_size=13, font_color=GRAY, font_name="DM Sans")
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 5: MARKET OPPORTUNITY  — white bg, left dark cards, right image
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 5: MARKET OPPORTUNITY  — white bg, left dark cards, right image
+# ══════════════════════════════════════════════════════════════
+@register_slide("market", images=["slide5_Image 0.jpg"], notes="Market Opportunity")
+def market_slide(slide, deck):
     set_slide_bg(slide, WHITE)
 
-    add_picture(slide, img("slide5_Image 0.jpg"),
+    add_picture(slide, deck.img("slide5_Image 0.jpg"),
                 Inches(8.8), Inches(0), Inches(4.53), Inches(7.5))
 
     add_text_box(slide, Inches(0.8), Inches(0.5), Inches(5.0), Inches(0.4),
@@ -361,10 +637,12 @@ def build_deck():
                  "that compounds in value \u2014 a moat no competitor can replicate without our user base.",
                  font_size=15, font_color=CHARCOAL, font_name="Playfair Display")
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 6: FASHION INTELLIGENCE  — dark bg, data platform story
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 6: FASHION INTELLIGENCE  — dark bg, data platform story
+# ══════════════════════════════════════════════════════════════
+@register_slide("fashion_intelligence")
+def fashion_intelligence_slide(slide, deck):
     set_slide_bg(slide, BLACK)
 
     add_text_box(slide, Inches(0.8), Inches(0.5), Inches(11.0), Inches(0.4),
@@ -444,13 +722,15 @@ def build_deck():
                  "Ours is built on what real people actually wear.",
                  font_size=16, font_color=CORAL, font_name="Playfair Display")
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 7: BUSINESS MODEL  — white bg, 3 tier cards, right image
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 7: BUSINESS MODEL  — white bg, 3 tier cards, right image
+# ══════════════════════════════════════════════════════════════
+@register_slide("business_model", images=["slide6_Picture 22.png"], notes="Business Model")
+def business_model_slide(slide, deck):
     set_slide_bg(slide, WHITE)
 
-    add_picture(slide, img("slide6_Picture 22.png"),
+    add_picture(slide, deck.img("slide6_Picture 22.png"),
                 Inches(9.6), Inches(0), Inches(3.73), Inches(7.5))
 
     add_text_box(slide, Inches(0.8), Inches(0.5), Inches(5.0), Inches(0.4),
@@ -509,10 +789,12 @@ def build_deck():
                  "\u2022  Layer 3 \u2014 B2B data: Trend API  \u2022  White-label SDK",
                  font_size=13, font_color=CORAL, font_name="DM Sans")
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 7: UNIT ECONOMICS  — white bg, 4 dark cards
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 7: UNIT ECONOMICS  — white bg, 4 dark cards
+# ══════════════════════════════════════════════════════════════
+@register_slide("unit_economics", notes="Unit Economics")
+def unit_economics_slide(slide, deck):
     set_slide_bg(slide, WHITE)
 
     add_text_box(slide, Inches(0.8), Inches(0.5), Inches(5.0), Inches(0.4),
@@ -546,13 +828,15 @@ def build_deck():
                  "Our COGS improves automatically \u2014 the opposite of most consumer businesses.",
                  font_size=17, font_color=CHARCOAL, font_name="Playfair Display")
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 8: GROWTH  — white bg, left loop + dark GTM card, right image
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 8: GROWTH  — white bg, left loop + dark GTM card, right image
+# ══════════════════════════════════════════════════════════════
+@register_slide("growth", images=["slide8_Picture 8.jpg"], notes="The Flywheel")
+def growth_slide(slide, deck):
     set_slide_bg(slide, WHITE)
 
-    add_picture(slide, img("slide8_Picture 8.jpg"),
+    add_picture(slide, deck.img("slide8_Picture 8.jpg"),
                 Inches(10.1), Inches(0), Inches(3.23), Inches(7.5))
 
     add_text_box(slide, Inches(0.8), Inches(0.5), Inches(5.0), Inches(0.4),
@@ -590,10 +874,12 @@ def build_deck():
         {"text": "\u2022  ProductHunt launch",     "size": 14, "color": GRAY, "space_after": 5},
     ])
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 9: COMPETITION  — white bg, 4 cards (3 white + 1 coral)
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 9: COMPETITION  — white bg, 4 cards (3 white + 1 coral)
+# ══════════════════════════════════════════════════════════════
+@register_slide("competition", notes="Competitive Landscape")
+def competition_slide(slide, deck):
     set_slide_bg(slide, WHITE)
 
     add_text_box(slide, Inches(0.8), Inches(0.5), Inches(5.0), Inches(0.4),
@@ -632,10 +918,12 @@ def build_deck():
                  "Affiliate commerce intelligence calibrates with every conversion.",
                  font_size=15, font_color=CHARCOAL, font_name="DM Sans")
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 10: TRACTION  — white bg, 4 dark status cards + targets
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 10: TRACTION  — white bg, 4 dark status cards + targets
+# ══════════════════════════════════════════════════════════════
+@register_slide("traction", notes="Traction & Status")
+def traction_slide(slide, deck):
     set_slide_bg(slide, WHITE)
 
     add_text_box(slide, Inches(0.8), Inches(0.5), Inches(5.0), Inches(0.4),
@@ -681,10 +969,12 @@ def build_deck():
         add_text_box(slide, x, Inches(6.0), Inches(2.5), Inches(0.3),
                      label, font_size=13, font_color=CHARCOAL, font_name="DM Sans")
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 11: ROADMAP  — white bg, 4 phase cards
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 11: ROADMAP  — white bg, 4 phase cards
+# ══════════════════════════════════════════════════════════════
+@register_slide("roadmap", notes="Roadmap")
+def roadmap_slide(slide, deck):
     set_slide_bg(slide, WHITE)
 
     add_text_box(slide, Inches(0.8), Inches(0.5), Inches(5.0), Inches(0.4),
@@ -738,10 +1028,23 @@ def build_deck():
             for item in items
         ])
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 12: THE TEAM  — white bg, left founder photo + right bio + top-right logos
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 12: THE TEAM  — white bg, left founder photo + right bio + top-right logos
+# ══════════════════════════════════════════════════════════════
+# Top-right company logos on the team slide
+TEAM_LOGOS = [
+    ("slide12_Picture 2.png",  Inches(9.35),  Inches(0.13), Inches(1.28), Inches(1.28)),
+    ("slide12_Picture 4.jpg",  Inches(10.63), Inches(0.02), Inches(2.67), Inches(1.27)),
+    ("slide12_Picture 8.png",  Inches(10.35), Inches(1.29), Inches(2.67), Inches(0.94)),
+    ("slide12_Picture 10.png", Inches(10.67), Inches(2.4),  Inches(2.04), Inches(1.14)),
+    ("slide12_Picture 12.png", Inches(10.23), Inches(3.94), Inches(2.92), Inches(0.81)),
+    ("slide12_Picture 14.png", Inches(10.81), Inches(4.92), Inches(2.34), Inches(2.34)),
+]
+
+@register_slide("team", images=["slide12_Picture 26.jpg", *(logo[0] for logo in TEAM_LOGOS)],
+                notes="The Team")
+def team_slide(slide, deck):
     set_slide_bg(slide, WHITE)
 
     add_text_box(slide, Inches(0.8), Inches(0.5), Inches(5.0), Inches(0.4),
@@ -754,7 +1057,7 @@ def build_deck():
     coral_rule(slide, left=Inches(0.8), top=Inches(2.2))
 
     # Left — founder photo placeholder (dark rect same size as reference)
-    add_picture(slide, img("slide12_Picture 26.jpg"),
+    add_picture(slide, deck.img("slide12_Picture 26.jpg"),
                 Inches(0.3), Inches(2.43), Inches(3.38), Inches(5.07),
                 placeholder=BLACK)
 
@@ -782,26 +1085,20 @@ def build_deck():
     ], line_spacing=1.4)
 
     # Top-right company logos
-    logo_imgs = [
-        ("slide12_Picture 2.png",  Inches(9.35),  Inches(0.13), Inches(1.28), Inches(1.28)),
-        ("slide12_Picture 4.jpg",  Inches(10.63), Inches(0.02), Inches(2.67), Inches(1.27)),
-        ("slide12_Picture 8.png",  Inches(10.35), Inches(1.29), Inches(2.67), Inches(0.94)),
-        ("slide12_Picture 10.png", Inches(10.67), Inches(2.4),  Inches(2.04), Inches(1.14)),
-        ("slide12_Picture 12.png", Inches(10.23), Inches(3.94), Inches(2.92), Inches(0.81)),
-        ("slide12_Picture 14.png", Inches(10.81), Inches(4.92), Inches(2.34), Inches(2.34)),
-    ]
-    for fname, l, t, w, h in logo_imgs:
-        path = img(fname)
+    for fname, l, t, w, h in TEAM_LOGOS:
+        path = deck.img(fname)
         if path:
             slide.shapes.add_picture(path, l, t, w, h)
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 13: THE ASK  — dark bg, 4 white fund cards, right image
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 13: THE ASK  — dark bg, 4 white fund cards, right image
+# ══════════════════════════════════════════════════════════════
+@register_slide("ask", images=["slide13_Picture 4.jpg"], notes="The Ask")
+def ask_slide(slide, deck):
     set_slide_bg(slide, BLACK)
 
-    add_picture(slide, img("slide13_Picture 4.jpg"),
+    add_picture(slide, deck.img("slide13_Picture 4.jpg"),
                 Inches(10.0), Inches(0), Inches(3.33), Inches(7.5))
 
     add_text_box(slide, Inches(0.8), Inches(0.5), Inches(5.0), Inches(0.4),
@@ -836,13 +1133,15 @@ def build_deck():
                  "250K MAU  \u2022  75K daily verdicts  \u2022  $1M+ ARR  \u2022  Series A metrics",
                  font_size=17, font_color=WHITE, font_name="DM Sans")
 
-    # ══════════════════════════════════════════════════════════════
-    # SLIDE 14: CLOSING  — dark bg, left half image, right logo + contact
-    # ══════════════════════════════════════════════════════════════
-    slide = prs.slides.add_slide(blank)
+
+# ══════════════════════════════════════════════════════════════
+# SLIDE 14: CLOSING  — dark bg, left half image, right logo + contact
+# ══════════════════════════════════════════════════════════════
+@register_slide("closing", images=["slide14_Picture 1.jpg"], notes="Closing")
+def closing_slide(slide, deck):
     set_slide_bg(slide, BLACK)
 
-    add_picture(slide, img("slide14_Picture 1.jpg"),
+    add_picture(slide, deck.img("slide14_Picture 1.jpg"),
                 Inches(0), Inches(0), Inches(5.5), Inches(7.5))
 
     coral_rule(slide, left=Inches(6.5), top=Inches(2.2), width=Inches(2.0))
@@ -860,13 +1159,158 @@ def build_deck():
                  "bradavis2011@gmail.com  \u2022  orthis.app",
                  font_size=15, font_color=GRAY, font_name="DM Sans")
 
-    # ── Save ──
-    output_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
-                               "OrThis_Seed_Pitch_Deck.pptx")
-    prs.save(output_path)
-    print(f"Pitch deck saved to: {output_path}")
-    return output_path
+    if deck.tracking:
+        tracking_footer(slide, deck.tracking)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Deck assembly
+# ──────────────────────────────────────────────────────────────────────────────
+
+class DeckBuilder:
+    """
+    Builds a deck from any subset or ordering of the registered slides;
+    only the requested slides are built.
+
+        DeckBuilder().build(["title", "traction", "ask"], "excerpt.pptx")
+
+    `core_properties` overrides the normalized document properties.
+    `recipient` adds a "Prepared for" line to the title slide and `tracking`
+    a confidentiality footer to the title and closing slides. `consolidate`
+    runs the shape-count reduction pass (see consolidate_shapes.py).
+    `images` is where photos come from (default: S3 when configured, else
+    extracted_images/; see image_source.py). `large_deck` allocates slide,
+    image and shape IDs from running counters so build time stays linear in
+    the slide count (see large_deck.py); the output is the same either way.
+    Each slide's section of `notes_path` (None for no notes) is written into
+    its speaker notes. With `use_cache`, a deck built earlier from identical
+    inputs is copied from the cache instead of rebuilt, and one that differs
+    only in notes has just the changed notes parts rewritten.
+    """
+
+    def __init__(self, core_properties=None, recipient=None, tracking=None,
+                 consolidate=True, use_cache=True, images=None, large_deck=False,
+                 notes_path=NOTES_PATH):
+        self.core_properties = core_properties
+        self.recipient = recipient
+        self.tracking = tracking
+        self.consolidate = consolidate
+        self.use_cache = use_cache
+        self.images = images or image_source_from_env(IMG_DIR, IMAGE_CACHE_DIR)
+        self.large_deck = large_deck
+        self.notes = load_speaker_notes(notes_path, NOTES_CACHE_DIR) if notes_path else {}
+
+    def img(self, filename):
+        """Local path of `filename`, or None to draw the placeholder."""
+        return self.images.path(filename)
+
+    def resolve(self, slides=None):
+        if slides is None:
+            return list(SLIDE_BUILDERS)
+        unknown = [name for name in slides if name not in SLIDE_BUILDERS]
+        if unknown:
+            raise ValueError(f"Unknown slide(s): {', '.join(unknown)}. "
+                             f"Available: {', '.join(SLIDE_BUILDERS)}")
+        return list(slides)
+
+    def build(self, slides=None, output_path=OUTPUT_PATH):
+        names = self.resolve(slides)
+        # Every image the deck needs is fetched in one concurrent batch
+        # before the cache lookup, since the key covers their bytes.
+        images = self.images.prefetch([f for name in names for f in SLIDE_IMAGES[name]])
+        core_properties = normalized_core_properties(self.core_properties)
+        notes = [self.notes.get(SLIDE_NOTES[name]) for name in names]
+        layout_key = deck_cache_key({"core_properties": core_properties,
+                                     "recipient": self.recipient, "tracking": self.tracking,
+                                     "consolidate": self.consolidate, "slides": names,
+                                     "notes": [text is not None for text in notes]}, images)
+        # Notes parts are numbered in slide order over the slides that have notes
+        notes_members = {notes_partname(number).membername: text for number, text
+                         in enumerate((text for text in notes if text is not None), 1)}
+        digests = {member: notes_digest(text) for member, text in notes_members.items()}
+        key = hashlib.sha256(json.dumps([layout_key, digests], sort_keys=True).encode()).hexdigest()
+
+        hit = cached_deck(key) if self.use_cache else None
+        if hit:
+            shutil.copyfile(hit, output_path)
+            print(f"Pitch deck saved to: {output_path} (cached)")
+            return output_path
+
+        # Decks that differ only in notes text share a layout key; patch the
+        # last one built for this layout (see speaker_notes.py)
+        record = notes_record(DECK_CACHE_DIR, layout_key) if self.use_cache else None
+        previous = cached_deck(record["deck"]) if record else None
+        if previous:
+            changed = {member: text for member, text in notes_members.items()
+                       if record["notes"].get(member) != digests[member]}
+            patch_notes(previous, output_path, changed, base_template())
+            store_cached_deck(key, output_path)
+            store_notes_record(DECK_CACHE_DIR, layout_key, key, digests)
+            print(f"Pitch deck saved to: {output_path} ({len(changed)} notes updated)")
+            return output_path
+
+        prs = Presentation(base_template())
+        blank = prs.slide_layouts[0]
+        add_slide = LargeDeck(prs).add_slide if self.large_deck else prs.slides.add_slide
+        notes_master = prs.part.notes_master_part if notes_members else None
+        number = 0
+        for name, text in zip(names, notes):
+            slide = add_slide(blank)
+            SLIDE_BUILDERS[name](slide, self)
+            if text is not None:
+                number += 1
+                add_notes_slide(slide, text, number, notes_master)
+
+        if self.consolidate:
+            consolidate_deck(prs)
+        apply_core_properties(prs, core_properties)
+        save_deterministic(prs, output_path)
+        if self.use_cache:
+            store_cached_deck(key, output_path)
+            store_notes_record(DECK_CACHE_DIR, layout_key, key, digests)
+        print(f"Pitch deck saved to: {output_path}")
+        return output_path
+
+
+def build_deck(output_path=OUTPUT_PATH, core_properties=None, use_cache=True,
+               recipient=None, tracking=None, consolidate=True, slides=None,
+               large_deck=False, notes_path=NOTES_PATH):
+    """Build `slides` (default: the full deck, in order) into `output_path`."""
+    builder = DeckBuilder(core_properties=core_properties, recipient=recipient,
+                          tracking=tracking, consolidate=consolidate, use_cache=use_cache,
+                          large_deck=large_deck, notes_path=notes_path)
+    return builder.build(slides, output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the Or This? pitch deck.")
+    parser.add_argument("--slides",
+                        help="comma-separated slide names in the order to build them "
+                             "(default: the full deck)")
+    parser.add_argument("--list-slides", action="store_true",
+                        help="print the registered slide names and exit")
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--large-deck", action="store_true",
+                        help="constant-time slide/shape ID allocation for decks "
+                             "with hundreds or thousands of slides")
+    parser.add_argument("--no-notes", action="store_true",
+                        help="leave out the speaker notes from Speaker_Notes.md")
+    args = parser.parse_args()
+
+    if args.list_slides:
+        print("\n".join(SLIDE_BUILDERS))
+        return
+    slides = [name.strip() for name in args.slides.split(",") if name.strip()] if args.slides else None
+    try:
+        build_deck(args.output, use_cache=not args.no_cache, slides=slides,
+                   large_deck=args.large_deck,
+                   notes_path=None if args.no_notes else NOTES_PATH)
+    except ValueError as e:
+        parser.error(str(e))
+    except S3AccessError as e:
+        sys.exit(f"error: {e}")
 
 
 if __name__ == "__main__":
-    build_deck()
+    main()
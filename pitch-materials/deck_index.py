@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Full-text index over generated pitch decks.
+
+Answers questions like "which investor copies still say '16 autonomous
+agents'?" without opening every .pptx. Slide text is read straight out of
+each deck's zip members into an on-disk inverted index (SQLite) with term
+positions per (deck, slide, shape).
+
+Slide content is indexed once per distinct slide XML: stamped copies share
+all but their stamped slides, so tens of thousands of copies cost little
+more than the handful of slides that actually differ. Updates are
+incremental; a deck whose size and mtime are unchanged is skipped.
+
+Usage:
+    python deck_index.py update stamped/ OrThis_Seed_Pitch_Deck.pptx
+    python deck_index.py query '16 autonomous agents'
+    python deck_index.py query '$7.99' --decks
+"""
+
+from lxml import etree
+import argparse
+import hashlib
+import os
+import posixpath
+import re
+import sqlite3
+import time
+import zipfile
+
+from create_pitch_deck import CACHE_DIR
+
+INDEX_PATH = os.path.join(CACHE_DIR, "deck_index.sqlite3")
+
+_NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_A = "{%s}" % _NS["a"]
+_P = "{%s}" % _NS["p"]
+_SLIDE_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+
+# Bump when tokenization or positions change so existing indexes are rebuilt
+INDEX_VERSION = 2
+
+# Words, numbers and prices stay whole: "$7.99", "40%", "don't", "16"
+_CURRENCY = "$€£"
+_TOKEN = re.compile(rf"[{_CURRENCY}]?\w+(?:[.,'’]\w+)*%?")
+# Gap left between paragraphs, and between the tab-separated columns of a
+# merged row, so a phrase can't match across them
+_PARAGRAPH_GAP = 1
+
+_TABLES = ("decks", "contents", "slides", "shapes", "terms", "postings")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decks (
+    id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS contents (
+    id INTEGER PRIMARY KEY, digest TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS slides (
+    deck_id INTEGER NOT NULL, slide INTEGER NOT NULL, content_id INTEGER NOT NULL,
+    PRIMARY KEY (deck_id, slide)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS slides_by_content ON slides (content_id);
+CREATE TABLE IF NOT EXISTS shapes (
+    content_id INTEGER NOT NULL, shape INTEGER NOT NULL,
+    shape_id INTEGER, name TEXT, text TEXT NOT NULL,
+    PRIMARY KEY (content_id, shape)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY, term TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL, content_id INTEGER NOT NULL,
+    shape INTEGER NOT NULL, pos INTEGER NOT NULL,
+    PRIMARY KEY (term_id, content_id, shape, pos)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_by_content ON postings (content_id);
+"""
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def _index_terms(token):
+    """A price is indexed under "$7.99" and "7.99", so either form finds it."""
+    if token[0] in _CURRENCY:
+        return token, token[1:]
+    return (token,)
+
+
+def slide_members(zf):
+    """Slide XML member names of an open .pptx, in presentation order."""
+    rels = etree.fromstring(zf.read("ppt/_rels/presentation.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target")
+               for rel in rels.iterfind("rel:Relationship", _NS)
+               if rel.get("Type") == _SLIDE_REL}
+    presentation = etree.fromstring(zf.read("ppt/presentation.xml"))
+    rIds = presentation.xpath("p:sldIdLst/p:sldId/@r:id", namespaces=_NS)
+    return [targets[rId].lstrip("/") if targets[rId].startswith("/")
+            else posixpath.normpath(posixpath.join("ppt", targets[rId])) for rId in rIds]
+
+
+def slide_shapes(xml):
+    """
+    [(shape_id, name, paragraphs)] for each text-bearing shape in a slide's
+    XML; table cells of a graphic frame count as its paragraphs.
+    """
+    shapes = []
+    for shape in etree.fromstring(xml).iter(_P + "sp", _P + "graphicFrame"):
+        paragraphs = []
+        for p in shape.iter(_A + "p"):
+            text = "".join((el.text or "") if el.tag == _A + "t" else " "
+                           for el in p.iter(_A + "t", _A + "br"))
+            if text.strip():
+                paragraphs.append(text)
+        if paragraphs:
+            c_nv_pr = shape.find(".//p:cNvPr", _NS)
+            shape_id = int(c_nv_pr.get("id")) if c_nv_pr is not None else None
+            name = c_nv_pr.get("name") if c_nv_pr is not None else None
+            shapes.append((shape_id, name, paragraphs))
+    return shapes
+
+
+class DeckIndex:
+    """Positional inverted index of deck text stored at `path`."""
+
+    def __init__(self, path=INDEX_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        version, = self.db.execute("PRAGMA user_version").fetchone()
+        if version != INDEX_VERSION:
+            for table in _TABLES:
+                self.db.execute(f"DROP TABLE IF EXISTS {table}")
+            self.db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.db.executescript(_SCHEMA)
+        self._term_ids = None
+
+    def close(self):
+        self.db.close()
+
+    # ── Indexing ──
+
+    def update(self, paths):
+        """
+        Index the .pptx files in `paths` (files or directories). Unchanged
+        decks are skipped. Returns the number of decks (re)indexed.
+        """
+        self._term_ids = dict(self.db.execute("SELECT term, id FROM terms"))
+        indexed = 0
+        with self.db:
+            for path in _iter_decks(paths):
+                if self._index_deck(path):
+                    indexed += 1
+            self._drop_orphans()
+        return indexed
+
+    def prune(self):
+        """Forget decks whose files no longer exist."""
+        gone = [(deck_id,) for deck_id, path in self.db.execute("SELECT id, path FROM decks")
+                if not os.path.exists(path)]
+        with self.db:
+            self.db.executemany("DELETE FROM slides WHERE deck_id = ?", gone)
+            self.db.executemany("DELETE FROM decks WHERE id = ?", gone)
+            self._drop_orphans()
+        return len(gone)
+
+    def _index_deck(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        row = self.db.execute("SELECT id, size, mtime_ns FROM decks WHERE path = ?",
+                              (path,)).fetchone()
+        if row and row[1:] == (st.st_size, st.st_mtime_ns):
+            return False
+
+        with zipfile.ZipFile(path) as zf:
+            slides = []
+            for number, member in enumerate(slide_members(zf), 1):
+                xml = zf.read(member)
+                slides.append((number, self._content_id(xml)))
+
+        if row:
+            deck_id = row[0]
+            self.db.execute("UPDATE decks SET size = ?, mtime_ns = ? WHERE id = ?",
+                            (st.st_size, st.st_mtime_ns, deck_id))
+            self.db.execute("DELETE FROM slides WHERE deck_id = ?", (deck_id,))
+        else:
+            deck_id = self.db.execute("INSERT INTO decks (path, size, mtime_ns) VALUES (?, ?, ?)",
+                                      (path, st.st_size, st.st_mtime_ns)).lastrowid
+        self.db.executemany("INSERT INTO slides (deck_id, slide, content_id) VALUES (?, ?, ?)",
+                            [(deck_id, number, content_id) for number, content_id in slides])
+        return True
+
+    def _content_id(self, xml):
+        """Id of the indexed content for slide `xml`, indexing it if new."""
+        digest = hashlib.sha256(xml).hexdigest()
+        row = self.db.execute("SELECT id FROM contents WHERE digest = ?", (digest,)).fetchone()
+        if row:
+            return row[0]
+        content_id = self.db.execute("INSERT INTO contents (digest) VALUES (?)",
+                                     (digest,)).lastrowid
+        shapes, postings = [], []
+        for shape, (shape_id, name, paragraphs) in enumerate(slide_shapes(xml)):
+            shapes.append((content_id, shape, shape_id, name, "\n".join(paragraphs)))
+            pos = 0
+            for paragraph in paragraphs:
+                for column in paragraph.split("\t"):
+                    for token in tokenize(column):
+                        for term in _index_terms(token):
+                            postings.append((self._term_id(term), content_id, shape, pos))
+                        pos += 1
+                    pos += _PARAGRAPH_GAP
+        self.db.executemany("INSERT INTO shapes VALUES (?, ?, ?, ?, ?)", shapes)
+        self.db.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?, ?, ?)", postings)
+        return content_id
+
+    def _term_id(self, term):
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = self.db.execute("INSERT INTO terms (term) VALUES (?)", (term,)).lastrowid
+            self._term_ids[term] = term_id
+        return term_id
+
+    def _drop_orphans(self):
+        orphans = "SELECT id FROM contents WHERE id NOT IN (SELECT content_id FROM slides)"
+        self.db.execute(f"DELETE FROM postings WHERE content_id IN ({orphans})")
+        self.db.execute(f"DELETE FROM shapes WHERE content_id IN ({orphans})")
+        self.db.execute(f"DELETE FROM contents WHERE id IN ({orphans})")
+
+    # ── Queries ──
+
+    def _matches(self, phrase):
+        """
+        SQL and parameters selecting the (content_id, shape) pairs that hold
+        `phrase`, or None if some token was never indexed. The join is driven
+        from the rarest token's postings.
+        """
+        tokens = tokenize(phrase)
+        if not tokens:
+            return None
+        terms = []
+        for token in tokens:
+            row = self.db.execute("SELECT id FROM terms WHERE term = ?", (token,)).fetchone()
+            if row is None:
+                return None
+            count, = self.db.execute("SELECT COUNT(*) FROM postings WHERE term_id = ?",
+                                     (row[0],)).fetchone()
+            terms.append((row[0], count))
+        anchor = min(range(len(terms)), key=lambda i: terms[i][1])
+
+        # CROSS JOIN keeps SQLite from reordering away from the anchor
+        joins = "".join(
+            f" CROSS JOIN postings p{i} ON p{i}.term_id = ? AND p{i}.content_id = pa.content_id"
+            f" AND p{i}.shape = pa.shape AND p{i}.pos = pa.pos + {i - anchor}"
+            for i in range(len(terms)) if i != anchor)
+        params = [term_id for i, (term_id, _) in enumerate(terms) if i != anchor]
+        return (f"SELECT DISTINCT pa.content_id, pa.shape FROM postings pa{joins}"
+                " WHERE pa.term_id = ?", params + [terms[anchor][0]])
+
+    def search(self, phrase):
+        """
+        [(deck path, slide number, shape name, shape text)] for every shape
+        containing `phrase` as consecutive tokens, ordered by deck and slide.
+        """
+        matches = self._matches(phrase)
+        if matches is None:
+            return []
+        sql, params = matches
+        return self.db.execute(
+            f"SELECT d.path, sl.slide, sh.name, sh.text FROM ({sql}) m"
+            " JOIN shapes sh ON sh.content_id = m.content_id AND sh.shape = m.shape"
+            " JOIN slides sl ON sl.content_id = m.content_id"
+            " JOIN decks d ON d.id = sl.deck_id"
+            " ORDER BY d.path, sl.slide, m.shape", params).fetchall()
+
+    def decks_containing(self, phrase):
+        """Sorted paths of the decks containing `phrase`."""
+        matches = self._matches(phrase)
+        if matches is None:
+            return []
+        sql, params = matches
+        return [path for path, in self.db.execute(
+            f"SELECT DISTINCT d.path FROM (SELECT DISTINCT content_id FROM ({sql})) m"
+            " JOIN slides sl ON sl.content_id = m.content_id"
+            " JOIN decks d ON d.id = sl.deck_id"
+            " ORDER BY d.path", params)]
+
+
+def _iter_decks(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.endswith(".pptx") and not name.startswith("~$"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--index", default=INDEX_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    update = commands.add_parser("update", help="index new or changed decks")
+    update.add_argument("paths", nargs="+", help=".pptx files or directories")
+    update.add_argument("--prune", action="store_true", help="forget decks that were deleted")
+    query = commands.add_parser("query", help="find a phrase")
+    query.add_argument("phrase")
+    query.add_argument("--decks", action="store_true", help="list matching decks only")
+    args = parser.parse_args()
+
+    index = DeckIndex(args.index)
+    start = time.perf_counter()
+    if args.command == "update":
+        pruned = index.prune() if args.prune else 0
+        indexed = index.update(args.paths)
+        elapsed = time.perf_counter() - start
+        print(f"Indexed {indexed} decks, pruned {pruned} ({elapsed:.2f}s)")
+    elif args.decks:
+        decks = index.decks_containing(args.phrase)
+        elapsed = time.perf_counter() - start
+        print("\n".join(decks))
+        print(f"{len(decks)} decks ({elapsed * 1000:.1f} ms)")
+    else:
+        hits = index.search(args.phrase)
+        elapsed = time.perf_counter() - start
+        for path, slide, name, text in hits:
+            print(f"{path}  slide {slide}  [{name}]  {' '.join(text.split())[:100]}")
+        print(f"{len(hits)} matches ({elapsed * 1000:.1f} ms)")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Byte-level zip writing for decks saved by save_deterministic().
+
+Stamping recipient copies and patching speaker notes both rewrite a few
+members of an existing deck. Re-saving through zipfile would inflate and
+deflate every member, so instead the untouched members' compressed bytes
+are copied verbatim and only the replaced members are deflated, with the
+same headers zipfile writes for a deterministic deck (fixed timestamp,
+deflate, mode 0600, no extra fields). The result is the file
+save_deterministic() would have produced for the patched deck.
+
+    members = read_members("deck.pptx")
+    write_zip("patched.pptx", [deflate(m.name, new_xml) if m.name == name else m
+                               for m in members])
+"""
+
+from typing import NamedTuple
+import struct
+import zipfile
+import zlib
+
+from cache_files import replacing
+
+# Fixed zip member timestamp (the earliest date the zip format can store)
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+# ── Zip record layouts (APPNOTE 4.3.7 / 4.3.12 / 4.3.16) ──
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_ENTRY = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_LOCAL_SIGNATURE = 0x04034B50
+_CENTRAL_SIGNATURE = 0x02014B50
+_END_SIGNATURE = 0x06054B50
+
+_VERSION = 20                   # 2.0: deflate
+_EXTERNAL_ATTR = 0o600 << 16    # what zipfile.writestr() sets for a ZipInfo
+
+
+def dos_datetime(date_time):
+    """(DOS time, DOS date) fields for a (Y, M, D, h, m, s) tuple."""
+    year, month, day, hour, minute, second = date_time
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+_DOS_TIME, _DOS_DATE = dos_datetime(ZIP_EPOCH)
+
+
+class Member(NamedTuple):
+    """A deflated zip member: its name, CRC-32, compressed bytes and size."""
+    name: str
+    crc: int
+    compressed: bytes
+    size: int
+
+    def data(self):
+        return zlib.decompress(self.compressed, -zlib.MAX_WBITS)
+
+
+def deflate(name, data):
+    """Member for `data`, compressed the way zipfile compresses it."""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return Member(name, zlib.crc32(data), compressor.compress(data) + compressor.flush(), len(data))
+
+
+def read_members(path):
+    """The members of the deflated zip at `path`, in order, still compressed."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    members = []
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_DEFLATED:
+                raise ValueError(f"{path}: {info.filename} is not deflated")
+            # The local header's own name/extra lengths locate the data
+            *_, name_len, extra_len = _LOCAL_HEADER.unpack_from(raw, info.header_offset)
+            start = info.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+            members.append(Member(info.filename, info.CRC,
+                                  raw[start:start + info.compress_size], info.file_size))
+    return members
+
+
+def zip_records(members, offset=0):
+    """
+    Serialize `members` as if they start `offset` bytes into the file.
+    Returns ([local header, data, ...], central directory entries, offset
+    just past the last member).
+    """
+    chunks, central = [], []
+    for member in members:
+        name = member.name.encode("utf-8")
+        header = _LOCAL_HEADER.pack(_LOCAL_SIGNATURE, _VERSION, 0, zipfile.ZIP_DEFLATED,
+                                    _DOS_TIME, _DOS_DATE, member.crc, len(member.compressed),
+                                    member.size, len(name), 0) + name
+        central.append(_CENTRAL_ENTRY.pack(_CENTRAL_SIGNATURE, _VERSION, _VERSION, 0,
+                                           zipfile.ZIP_DEFLATED, _DOS_TIME, _DOS_DATE,
+                                           member.crc, len(member.compressed), member.size,
+                                           len(name), 0, 0, 0, 0, _EXTERNAL_ATTR, offset) + name)
+        chunks += [header, member.compressed]
+        offset += len(header) + len(member.compressed)
+    return chunks, b"".join(central), offset
+
+
+def end_record(count, central, central_offset):
+    """End of central directory record for `count` entries at `central_offset`."""
+    return _END_RECORD.pack(_END_SIGNATURE, 0, 0, count, count, len(central), central_offset, 0)
+
+
+def write_zip(path, members):
+    """Write `members` to `path` as a complete zip, replacing it atomically."""
+    chunks, central, offset = zip_records(members)
+    with replacing(path) as tmp_path, open(tmp_path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.write(central)
+        f.write(end_record(len(members), central, offset))
+    return path
+
+
+def replace_members(src_path, path, replacements):
+    """
+    Copy the zip at `src_path` to `path` with the members named in
+    `replacements` ({name: bytes}) swapped in; every other member is
+    copied without recompressing.
+    """
+    members = [deflate(member.name, replacements[member.name])
+               if member.name in replacements else member
+               for member in read_members(src_path)]
+    return write_zip(path, members)
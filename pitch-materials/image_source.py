@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Image sources for the pitch deck builder.
+
+The deck's photos live in S3 (see S3_SETUP.md). S3ImageSource fetches every
+image a deck needs concurrently over a small pool of keep-alive connections,
+keeps an on-disk copy validated by ETag (If-None-Match), and gives up on an
+image after a bounded timeout, falling back to a stale cached copy, then the
+local extracted_images/ file, then the CREAM placeholder.
+
+Works against AWS S3 or any S3-compatible endpoint (MinIO, moto server):
+
+    AWS_S3_BUCKET=fitcheck-images           # or PITCH_IMAGE_BUCKET
+    AWS_REGION=us-east-1
+    AWS_S3_ENDPOINT=http://localhost:9000   # optional, path-style endpoint
+    AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY   # optional, SigV4-signed GETs
+    AWS_SESSION_TOKEN                       # with temporary (STS/SSO) credentials
+    PITCH_IMAGE_PREFIX=pitch-materials/extracted_images/
+    PITCH_IMAGE_TIMEOUT=10                  # seconds before falling back
+
+A 401 or 403 from the bucket means the credentials or bucket policy are
+wrong rather than that S3 is unreachable, so it raises S3AccessError instead
+of falling back; otherwise a deck full of placeholders would be built and
+cached without anyone noticing.
+
+Without a bucket configured, LocalImageSource reads extracted_images/ as before.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from urllib.parse import quote, urlsplit
+import hashlib
+import hmac
+import http.client
+import os
+import queue
+import sys
+
+from cache_files import replacing
+
+DEFAULT_PREFIX = "pitch-materials/extracted_images/"
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_CONNECTIONS = 8
+
+_EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+_ACCESS_DENIED = (401, 403)
+
+
+class S3AccessError(PermissionError):
+    """The bucket refused the request: a credentials or policy problem."""
+
+
+class LocalImageSource:
+    """Images read straight from a local directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, name):
+        path = os.path.join(self.directory, name)
+        return path if os.path.exists(path) else None
+
+    def prefetch(self, names):
+        return {name: self.path(name) for name in names}
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, shared by worker threads."""
+
+    def __init__(self, scheme, host, port, size, timeout):
+        self._factory = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self._host, self._port, self._timeout = host, port, timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def request(self, method, path, headers):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._factory(self._host, self._port, timeout=self._timeout)
+        try:
+            conn.request(method, path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+        return response.status, response, body
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class S3ImageSource:
+    """
+    Images fetched from an S3 bucket into `cache_dir`, validated by ETag on
+    every prefetch.
+    """
+
+    def __init__(self, bucket, cache_dir, region="us-east-1", endpoint=None,
+                 prefix=DEFAULT_PREFIX, access_key=None, secret_key=None,
+                 session_token=None, fallback_dir=None, timeout=DEFAULT_TIMEOUT,
+                 max_connections=DEFAULT_CONNECTIONS):
+        self.bucket = bucket
+        self.region = region
+        self.prefix = prefix
+        self.cache_dir = cache_dir
+        self.fallback_dir = fallback_dir
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._credentials = ((access_key, secret_key, session_token)
+                             if access_key and secret_key else None)
+        self._resolved = {}
+
+        if endpoint:
+            # Path-style addressing for S3-compatible servers
+            url = urlsplit(endpoint)
+            self._base_path = url.path.rstrip("/") + "/" + bucket
+        else:
+            url = urlsplit(f"https://{bucket}.s3.{region}.amazonaws.com")
+            self._base_path = ""
+        self._host = url.netloc
+        self._pool = _ConnectionPool(url.scheme, url.hostname, url.port,
+                                     max_connections, timeout)
+
+    # ── Public API ──
+
+    def path(self, name):
+        if name not in self._resolved:
+            self.prefetch([name])
+        return self._resolved[name]
+
+    def prefetch(self, names):
+        """
+        Fetch `names` concurrently. Returns {name: local path or None}; None
+        means the image is unavailable and the placeholder should be drawn.
+        Raises S3AccessError if the bucket denies access.
+        """
+        requested = list(dict.fromkeys(names))
+        missing = [name for name in requested if name not in self._resolved]
+        if missing:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            executor = ThreadPoolExecutor(max_workers=min(self.max_connections, len(missing)))
+            futures = {executor.submit(self._fetch, name): name for name in missing}
+            done, _ = wait(futures, timeout=self.timeout)
+            executor.shutdown(wait=False, cancel_futures=True)
+            for future, name in futures.items():
+                error = "timed out"
+                if future in done:
+                    try:
+                        self._resolved[name] = future.result()
+                        continue
+                    except S3AccessError:
+                        raise
+                    except Exception as e:  # network errors, HTTP errors
+                        error = str(e)
+                self._resolved[name] = self._fallback(name, error)
+        return {name: self._resolved[name] for name in requested}
+
+    def close(self):
+        self._pool.close()
+
+    # ── Fetching ──
+
+    def _cache_paths(self, name):
+        path = os.path.join(self.cache_dir, name)
+        return path, path + ".etag"
+
+    def _fetch(self, name):
+        path, etag_path = self._cache_paths(name)
+        headers = {}
+        if os.path.exists(path) and os.path.exists(etag_path):
+            with open(etag_path, encoding="utf-8") as f:
+                headers["If-None-Match"] = f.read().strip()
+
+        status, response, body = self._get(self.prefix + name, headers)
+        if status == 304:
+            return path
+        if status in _ACCESS_DENIED:
+            raise S3AccessError(f"HTTP {status} for s3://{self.bucket}/{self.prefix}{name}; "
+                                "check the AWS credentials and bucket policy")
+        if status != 200:
+            raise OSError(f"HTTP {status} for s3://{self.bucket}/{self.prefix}{name}")
+
+        with replacing(path) as tmp_path, open(tmp_path, "wb") as f:
+            f.write(body)
+        etag = response.getheader("ETag")
+        if etag:
+            with replacing(etag_path) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(etag)
+        elif os.path.exists(etag_path):
+            os.remove(etag_path)
+        return path
+
+    def _fallback(self, name, error):
+        path, _ = self._cache_paths(name)
+        if os.path.exists(path):
+            source = "cached copy"
+        elif self.fallback_dir and os.path.exists(os.path.join(self.fallback_dir, name)):
+            path, source = os.path.join(self.fallback_dir, name), "local file"
+        else:
+            path, source = None, "placeholder"
+        print(f"Image {name!r} unavailable from S3 ({error}); using {source}", file=sys.stderr)
+        return path
+
+    def _get(self, key, extra_headers):
+        path = quote(f"{self._base_path}/{key}", safe="/~")
+        headers = {"Host": self._host}
+        if self._credentials:
+            headers.update(self._sign("GET", path))
+        headers.update(extra_headers)
+        return self._pool.request("GET", path, headers)
+
+    def _sign(self, method, path):
+        """AWS Signature Version 4 headers for an empty-bodied request."""
+        access_key, secret_key, session_token = self._credentials
+        now = datetime.now(timezone.utc)
+        amz_date, date = now.strftime("%Y%m%dT%H%M%SZ"), now.strftime("%Y%m%d")
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        headers = {"x-amz-content-sha256": _EMPTY_SHA256, "x-amz-date": amz_date}
+        if session_token:
+            headers["x-amz-security-token"] = session_token
+        # Canonical headers are lowercase and sorted; these already are
+        canonical_headers = {"host": self._host, **headers}
+        signed_headers = ";".join(canonical_headers)
+        canonical = "\n".join([
+            method, path, "",
+            *(f"{name}:{value}" for name, value in canonical_headers.items()), "",
+            signed_headers, _EMPTY_SHA256,
+        ])
+        to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope,
+                             hashlib.sha256(canonical.encode()).hexdigest()])
+        key = f"AWS4{secret_key}".encode()
+        for part in (date, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, to_sign.encode(), hashlib.sha256).hexdigest()
+        headers["Authorization"] = (f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+                                    f"SignedHeaders={signed_headers}, Signature={signature}")
+        return headers
+
+
+def image_source_from_env(local_dir, cache_dir):
+    """S3ImageSource when a bucket is configured, else LocalImageSource."""
+    bucket = os.environ.get("PITCH_IMAGE_BUCKET") or os.environ.get("AWS_S3_BUCKET")
+    if not bucket:
+        return LocalImageSource(local_dir)
+    return S3ImageSource(
+        bucket,
+        cache_dir,
+        region=os.environ.get("AWS_REGION", "us-east-1"),
+        endpoint=os.environ.get("AWS_S3_ENDPOINT"),
+        prefix=os.environ.get("PITCH_IMAGE_PREFIX", DEFAULT_PREFIX),
+        access_key=os.environ.get("AWS_ACCESS_KEY_ID"),
+        secret_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
+        session_token=os.environ.get("AWS_SESSION_TOKEN"),
+        fallback_dir=local_dir,
+        timeout=float(os.environ.get("PITCH_IMAGE_TIMEOUT", DEFAULT_TIMEOUT)),
+    )
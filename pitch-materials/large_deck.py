@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Large-deck mode: constant-time slide, image and shape ID allocation.
+
+python-pptx finds each new slide's ID, presentation relationship and image
+partname by scanning what is already in the package, so adding the n-th
+slide or picture costs O(n) and building an appendix-heavy deck is
+quadratic. LargeDeck scans the package once, then hands out slide IDs,
+slide partnames and image partnames from running counters, looks up images
+by SHA1 in a dict, and turns on per-slide shape ID counters (python-pptx's
+turbo-add mode). Allocation follows the same numbering python-pptx would
+use, so a deck built either way serializes to the same bytes.
+
+This goes through python-pptx internals, hence the exact version pin in
+requirements.txt.
+
+    deck = LargeDeck(prs)
+    slide = deck.add_slide(prs.slide_layouts[0])
+"""
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.parts.image import Image, ImagePart
+from pptx.parts.slide import SlidePart
+
+MIN_SLIDE_ID = 256
+
+
+def _partname_idx(part, prefix):
+    return part.partname.idx if part.partname.startswith(prefix) else None
+
+
+class LargeDeck:
+    """Slide factory for `prs` with O(1) ID and partname allocation."""
+
+    def __init__(self, prs):
+        self.prs = prs
+        self._part = prs.part
+        self._package = prs.part.package
+        self._sldIdLst = self._part._element.get_or_add_sldIdLst()
+
+        slide_ids = [sldId.id for sldId in self._sldIdLst]
+        self._next_slide_id = max([MIN_SLIDE_ID - 1] + slide_ids) + 1
+
+        # One walk of the package for existing slide and image parts
+        slide_idxs, image_idxs = [0], [0]
+        self._images = {}
+        for part in self._package.iter_parts():
+            idx = _partname_idx(part, "/ppt/slides/slide")
+            if idx is not None:
+                slide_idxs.append(idx)
+            idx = _partname_idx(part, "/ppt/media/image")
+            if idx is not None:
+                image_idxs.append(idx)
+                if hasattr(part, "sha1"):
+                    self._images.setdefault(part.sha1, part)
+        self._next_slide_idx = max(slide_idxs) + 1
+        self._next_image_idx = max(image_idxs) + 1
+
+        # SlidePart.get_or_add_image_part() asks the package for the image
+        # part; route that lookup through the SHA1 index.
+        self._package.get_or_add_image_part = self.get_or_add_image_part
+
+    def add_slide(self, slide_layout):
+        """Drop-in for `prs.slides.add_slide(slide_layout)`."""
+        partname = PackURI(f"/ppt/slides/slide{self._next_slide_idx}.xml")
+        self._next_slide_idx += 1
+        slide_part = SlidePart.new(partname, self._package, slide_layout.part)
+        # A brand-new part can't already be related, so skip relate_to()'s
+        # scan for an existing relationship. rIds are dense here, which keeps
+        # _add_relationship()'s next-rId probe to a single lookup.
+        rId = self._part.rels._add_relationship(RT.SLIDE, slide_part)
+
+        slide = slide_part.slide
+        slide.shapes.clone_layout_placeholders(slide_layout)
+        slide.shapes.turbo_add_enabled = True
+        self._sldIdLst._add_sldId(id=self._next_slide_id, rId=rId)
+        self._next_slide_id += 1
+        return slide
+
+    def get_or_add_image_part(self, image_file):
+        image = Image.from_file(image_file)
+        image_part = self._images.get(image.sha1)
+        if image_part is None:
+            partname = PackURI(f"/ppt/media/image{self._next_image_idx}.{image.ext}")
+            self._next_image_idx += 1
+            image_part = ImagePart(partname, image.content_type, self._package,
+                                   image.blob, image.filename)
+            self._images[image.sha1] = image_part
+        return image_part
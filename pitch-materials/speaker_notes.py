@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Speaker notes for the pitch deck, from Speaker_Notes.md.
+
+The markdown is parsed once into an index of {section title: notes text}
+(one section per "## Slide N: Title" heading) and cached on disk keyed by
+the file's sha256, so later builds only hash the file. Sections are matched
+to slides by title rather than number, since slides can be reordered or
+built selectively.
+
+Blockquote markers, emphasis and horizontal rules are stripped; each
+markdown paragraph becomes one notes paragraph.
+
+Decks that differ only in notes text share a layout key (every build input
+except the notes text). The last deck built for a layout is recorded with
+the digest of each notes member, so a notes edit patches just the changed
+notes parts into that deck (patch_notes) instead of rebuilding it.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from pptx import Presentation
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.oxml.slide import CT_NotesSlide
+from pptx.parts.slide import NotesSlidePart
+
+from cache_files import replacing
+from deck_zip import replace_members
+
+# Bump when parse_speaker_notes() output changes so cached indexes are redone
+NOTES_INDEX_VERSION = 1
+
+_SLIDE_HEADING = re.compile(r"^##\s+Slide\s+\d+\s*:\s*(.+?)\s*$")
+_EMPHASIS = re.compile(r"(\*\*|\*)(\S(?:.*?\S)?)\1")
+
+
+def parse_speaker_notes(markdown):
+    """{section title: notes text} for every "## Slide N: Title" section."""
+    sections = {}
+    title, paragraphs, lines = None, [], []
+
+    def end_paragraph():
+        if lines:
+            paragraphs.append(_EMPHASIS.sub(r"\2", " ".join(lines)))
+            lines.clear()
+
+    def end_section():
+        end_paragraph()
+        if title is not None and paragraphs:
+            sections[title] = "\n".join(paragraphs)
+        paragraphs.clear()
+
+    for line in markdown.splitlines():
+        if line.startswith("#"):
+            end_section()
+            match = _SLIDE_HEADING.match(line)
+            title = match.group(1) if match else None
+            continue
+        if title is None:
+            continue
+        line = line.strip()
+        if line.startswith(">"):
+            line = line[1:].strip()
+        if not line or re.fullmatch(r"-{3,}|\*{3,}", line):
+            end_paragraph()
+        else:
+            lines.append(line)
+    end_section()
+    return sections
+
+
+def load_speaker_notes(path, cache_dir):
+    """Parsed index of the notes file at `path`, cached by content hash."""
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{digest}_v{NOTES_INDEX_VERSION}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    sections = parse_speaker_notes(data.decode("utf-8"))
+    os.makedirs(cache_dir, exist_ok=True)
+    with replacing(cache_path) as tmp_path, open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(sections, f, ensure_ascii=False, sort_keys=True)
+    return sections
+
+
+def notes_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def notes_partname(number):
+    return PackURI(f"/ppt/notesSlides/notesSlide{number}.xml")
+
+
+def add_notes_slide(slide, text, number, notes_master_part):
+    """
+    Attach a notes slide holding `text` to `slide` as notesSlide`number`.
+
+    Same structure as `slide.notes_slide`, but the partname is given rather
+    than found by scanning the package, and the notes master is looked up
+    once by the caller, so adding notes stays constant-time per slide.
+    Builds the part with NotesSlidePart's constructor, which is not public
+    API (see requirements.txt).
+    """
+    slide_part = slide.part
+    notes_part = NotesSlidePart(notes_partname(number), CT.PML_NOTES_SLIDE,
+                                slide_part.package, CT_NotesSlide.new())
+    notes_part.relate_to(notes_master_part, RT.NOTES_MASTER)
+    notes_part.relate_to(slide_part, RT.SLIDE)
+    notes_slide = notes_part.notes_slide
+    notes_slide.clone_master_placeholders(notes_master_part.notes_master)
+    slide_part.relate_to(notes_part, RT.NOTES_SLIDE)
+    notes_slide.notes_text_frame.text = text
+    return notes_part
+
+
+_RECORD_SUFFIX = ".notes.json"
+
+
+def _record_path(cache_dir, layout_key):
+    return os.path.join(cache_dir, layout_key + _RECORD_SUFFIX)
+
+
+def notes_record(cache_dir, layout_key):
+    """{"deck": cache key, "notes": {member: digest}} of the last deck built for a layout."""
+    path = _record_path(cache_dir, layout_key)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def store_notes_record(cache_dir, layout_key, key, digests):
+    os.makedirs(cache_dir, exist_ok=True)
+    with replacing(_record_path(cache_dir, layout_key)) as tmp_path, \
+            open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"deck": key, "notes": digests}, f, sort_keys=True)
+
+
+def prune_notes_records(cache_dir):
+    """Delete the records whose deck has been evicted from `cache_dir`."""
+    for name in os.listdir(cache_dir):
+        if not name.endswith(_RECORD_SUFFIX):
+            continue
+        record = notes_record(cache_dir, name[:-len(_RECORD_SUFFIX)])
+        if record and not os.path.exists(os.path.join(cache_dir, record["deck"] + ".pptx")):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except FileNotFoundError:
+                pass
+
+
+def render_notes_xml(texts, template_path):
+    """
+    {member: notes slide XML} for {member: notes text}, produced by the same
+    add_notes_slide() path as a full build so the bytes match.
+    """
+    prs = Presentation(template_path)
+    notes_master = prs.part.notes_master_part
+    blank = prs.slide_layouts[0]
+    return {member: add_notes_slide(prs.slides.add_slide(blank), text, number, notes_master).blob
+            for number, (member, text) in enumerate(texts.items(), 1)}
+
+
+def patch_notes(src_path, path, texts, template_path):
+    """
+    Copy the deck at `src_path` to `path` with the notes members in `texts`
+    ({member: notes text}) re-rendered on the base template at
+    `template_path`; every other member is copied without recompressing.
+    """
+    return replace_members(src_path, path, render_notes_xml(texts, template_path))
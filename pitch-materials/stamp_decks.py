@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Stamp per-recipient copies of the "Or This?" pitch deck.
+
+The master deck is built once with marker strings where the recipient name
+and tracking footer go. Each copy reuses the master's compressed zip members
+byte-for-byte and only re-deflates the few slide XML members that contain a
+marker, so stamping is bound by I/O rather than by deck building.
+
+Usage:
+    python stamp_decks.py recipients.csv [--out-dir stamped] [--index]
+
+recipients.csv has a `recipient` column and an optional `tracking` column.
+Copies are written as OrThis_Seed_Pitch_Deck_<recipient>_<tracking>.pptx.
+"""
+
+from xml.sax.saxutils import escape
+import argparse
+import csv
+import hashlib
+import os
+import time
+
+from create_pitch_deck import CACHE_DIR, build_deck
+from deck_index import DeckIndex
+from deck_zip import deflate, end_record, read_members, zip_records
+
+RECIPIENT_MARK = b"{{RECIPIENT}}"
+TRACKING_MARK  = b"{{TRACKING}}"
+MASTER_PATH = os.path.join(CACHE_DIR, "stamp_master.pptx")
+
+
+def default_tracking(recipient):
+    """Short stable tracking code derived from the recipient name."""
+    return hashlib.sha256(recipient.encode("utf-8")).hexdigest()[:10].upper()
+
+
+def build_stamp_master(path=MASTER_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return build_deck(output_path=path,
+                      recipient=RECIPIENT_MARK.decode(),
+                      tracking=TRACKING_MARK.decode())
+
+
+class StampTemplate:
+    """
+    A master deck split into a verbatim prefix (every member without a
+    marker, already compressed) and the marked members kept as plain XML.
+    """
+
+    def __init__(self, master_path):
+        kept = []
+        self.stamped = []
+        for member in read_members(master_path):
+            data = member.data()
+            if RECIPIENT_MARK in data or TRACKING_MARK in data:
+                self.stamped.append((member.name, data))
+            else:
+                kept.append(member)
+        if not self.stamped:
+            raise ValueError(f"{master_path} contains no stamp markers")
+        chunks, self.prefix_central, _ = zip_records(kept)
+        self.prefix = b"".join(chunks)
+        self.prefix_count = len(kept)
+
+    def stamp(self, recipient, tracking=None):
+        """Return the bytes of a stamped copy for one recipient."""
+        return b"".join(self._stamp_chunks(recipient, tracking))
+
+    def stamp_to(self, path, recipient, tracking=None):
+        # Chunks are written one by one so the multi-megabyte prefix is
+        # handed to the OS as-is rather than copied into a joined buffer.
+        with open(path, "wb") as f:
+            for chunk in self._stamp_chunks(recipient, tracking):
+                f.write(chunk)
+        return path
+
+    def _stamp_chunks(self, recipient, tracking):
+        if tracking is None:
+            tracking = default_tracking(recipient)
+        recipient_xml = escape(recipient).encode("utf-8")
+        tracking_xml = escape(tracking).encode("utf-8")
+
+        members = [deflate(name, data.replace(RECIPIENT_MARK, recipient_xml)
+                                 .replace(TRACKING_MARK, tracking_xml))
+                   for name, data in self.stamped]
+        records, central, offset = zip_records(members, offset=len(self.prefix))
+        central = self.prefix_central + central
+        return [self.prefix, *records, central,
+                end_record(self.prefix_count + len(members), central, offset)]
+
+
+def _safe_filename(text):
+    keep = "".join(c if c.isalnum() or c in "-_ " else "_" for c in text)
+    return "_".join(keep.split()) or "recipient"
+
+
+def stamped_filename(recipient, tracking=None):
+    """
+    Output name for one stamped copy. The tracking code is part of the name
+    so recipients whose names sanitize alike still get separate files.
+    """
+    if tracking is None:
+        tracking = default_tracking(recipient)
+    return f"OrThis_Seed_Pitch_Deck_{_safe_filename(recipient)}_{_safe_filename(tracking)}.pptx"
+
+
+def stamp_decks(recipients, out_dir, template=None):
+    """
+    Stamp one copy per (recipient, tracking) pair into `out_dir`.
+    Builds (or reuses the cached) stamp master unless `template` is given.
+    Raises ValueError before writing anything if two pairs would share an
+    output file.
+    """
+    targets = {}
+    for recipient, tracking in recipients:
+        filename = stamped_filename(recipient, tracking)
+        # Compare case-folded: macOS and Windows filesystems are case-insensitive
+        if filename.lower() in targets:
+            raise ValueError(f"{recipient!r} and {targets[filename.lower()]!r} would both be "
+                             f"stamped to {filename}; give them distinct tracking codes")
+        targets[filename.lower()] = recipient
+
+    template = template or StampTemplate(build_stamp_master())
+    os.makedirs(out_dir, exist_ok=True)
+    return [template.stamp_to(os.path.join(out_dir, stamped_filename(recipient, tracking)),
+                              recipient, tracking)
+            for recipient, tracking in recipients]
+
+
+def read_recipients(csv_path):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return [(row["recipient"].strip(), (row.get("tracking") or "").strip() or None)
+                for row in csv.DictReader(f) if row.get("recipient", "").strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("recipients", help="CSV with recipient[,tracking] columns")
+    parser.add_argument("--out-dir", default="stamped")
+    parser.add_argument("--index", action="store_true",
+                        help="add the stamped decks to the full-text index (see deck_index.py)")
+    args = parser.parse_args()
+
+    recipients = read_recipients(args.recipients)
+    template = StampTemplate(build_stamp_master())
+    start = time.perf_counter()
+    try:
+        paths = stamp_decks(recipients, args.out_dir, template=template)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+    rate = len(paths) / elapsed if elapsed else float("inf")
+    print(f"Stamped {len(paths)} decks into {args.out_dir} ({rate:,.0f} decks/sec)")
+
+    if args.index:
+        index = DeckIndex()
+        indexed = index.update(paths)
+        index.close()
+        print(f"Indexed {indexed} decks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Checks for consolidate_shapes.py on a full build: every merge keeps the text
+geometry of every slide, and the pass removes shapes.
+
+Usage:
+    python -m pytest -q test_consolidate_shapes.py
+"""
+
+from contextlib import redirect_stdout
+import io
+import os
+import tempfile
+import unittest
+
+from pptx import Presentation
+
+from consolidate_shapes import (consolidate_deck, merge_cards, merge_columns, merge_grids,
+                                merge_rows, same_geometry, text_geometry)
+from create_pitch_deck import SLIDE_BUILDERS, build_deck
+
+
+class ConsolidateShapesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "unconsolidated.pptx")
+            with redirect_stdout(io.StringIO()):
+                build_deck(path, consolidate=False, use_cache=False)
+            with open(path, "rb") as f:
+                cls.deck = f.read()
+
+    def presentation(self):
+        return Presentation(io.BytesIO(self.deck))
+
+    def test_merges_keep_text_geometry(self):
+        # The merges themselves, without consolidate_slide()'s rollback
+        for name, slide in zip(SLIDE_BUILDERS, self.presentation().slides):
+            with self.subTest(slide=name):
+                before = text_geometry(slide)
+                for merge in (merge_cards, merge_rows, merge_grids, merge_columns):
+                    merge(slide)
+                self.assertTrue(same_geometry(before, text_geometry(slide)))
+
+    def test_pass_removes_shapes(self):
+        prs = self.presentation()
+        before = sum(len(slide.shapes) for slide in prs.slides)
+        removed = consolidate_deck(prs)
+        self.assertGreater(removed, 0)
+        self.assertEqual(sum(len(slide.shapes) for slide in prs.slides), before - removed)
+
+    def test_solution_steps_become_one_table(self):
+        slide = self.presentation().slides[list(SLIDE_BUILDERS).index("solution")]
+        self.assertEqual(merge_grids(slide), 11)
+        tables = [shape.table for shape in slide.shapes if shape.has_table]
+        self.assertEqual(len(tables), 1)
+        self.assertEqual([cell.text for cell in tables[0].rows[0].cells],
+                         ["01", "", "Intelligence", "", "Style DNA learns you with every verdict."])
+
+
+if __name__ == "__main__":
+    unittest.main()
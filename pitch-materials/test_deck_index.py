@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Checks for deck_index.py: phrase boundaries, price tokens and incremental
+updates, on small decks written with python-pptx.
+
+Usage:
+    python -m pytest -q test_deck_index.py
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from pptx import Presentation
+from pptx.util import Inches
+
+from deck_index import DeckIndex
+
+
+def write_deck(path, *slides):
+    """A deck with one slide per entry; each entry is a list of text box texts."""
+    prs = Presentation()
+    for texts in slides:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        for i, text in enumerate(texts):
+            box = slide.shapes.add_textbox(Inches(1), Inches(1 + i), Inches(8), Inches(1))
+            box.text_frame.text = text
+    prs.save(path)
+    return path
+
+
+class DeckIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.index_path = os.path.join(self.tmp, "index.sqlite3")
+        self.index = DeckIndex(self.index_path)
+
+    def tearDown(self):
+        self.index.close()
+        self._tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def test_phrases_stop_at_tab_columns_and_paragraphs(self):
+        deck = write_deck(self.path("metrics.pptx"),
+                          ["MAU\tDaily verdicts\tD7 retention", "Style DNA\nlearns you"])
+        self.index.update([deck])
+        self.assertEqual(len(self.index.search("daily verdicts")), 1)
+        self.assertEqual(len(self.index.search("style dna")), 1)
+        self.assertEqual(self.index.search("mau daily verdicts"), [])
+        self.assertEqual(self.index.search("verdicts d7"), [])
+        self.assertEqual(self.index.search("dna learns"), [])
+
+    def test_prices_match_with_and_without_currency_sign(self):
+        deck = write_deck(self.path("pricing.pptx"), ["Premium $7.99/mo", "Pro plan 14.99"])
+        self.index.update([deck])
+        self.assertEqual(len(self.index.search("$7.99")), 1)
+        self.assertEqual(len(self.index.search("7.99")), 1)
+        self.assertEqual(len(self.index.search("premium 7.99 mo")), 1)
+        self.assertEqual(self.index.search("$14.99"), [])
+        self.assertEqual(self.index.decks_containing("14.99"), [os.path.abspath(deck)])
+
+    def test_unchanged_decks_are_skipped(self):
+        deck = write_deck(self.path("deck.pptx"), ["16 autonomous agents"])
+        self.assertEqual(self.index.update([self.tmp]), 1)
+        self.assertEqual(self.index.update([self.tmp]), 0)
+
+        write_deck(deck, ["12 autonomous agents"])
+        st = os.stat(deck)
+        os.utime(deck, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.index.update([deck]), 1)
+        self.assertEqual(self.index.search("16 autonomous agents"), [])
+        self.assertEqual(len(self.index.search("12 autonomous agents")), 1)
+
+    def test_prune_drops_deleted_decks_and_orphaned_content(self):
+        kept = write_deck(self.path("kept.pptx"), ["Shared slide"])
+        gone = write_deck(self.path("gone.pptx"), ["Shared slide"], ["Only in the deleted deck"])
+        self.index.update([kept, gone])
+        os.remove(gone)
+
+        self.assertEqual(self.index.prune(), 1)
+        self.assertEqual(self.index.search("only in the deleted deck"), [])
+        self.assertEqual(self.index.decks_containing("shared slide"), [os.path.abspath(kept)])
+        db = sqlite3.connect(self.index_path)
+        try:
+            contents, = db.execute("SELECT COUNT(*) FROM contents").fetchone()
+            orphans, = db.execute("SELECT COUNT(*) FROM postings WHERE content_id NOT IN"
+                                  " (SELECT content_id FROM slides)").fetchone()
+        finally:
+            db.close()
+        self.assertEqual(contents, 1)
+        self.assertEqual(orphans, 0)
+
+    def test_index_from_an_older_version_is_rebuilt(self):
+        deck = write_deck(self.path("deck.pptx"), ["Decision Coral"])
+        self.index.update([deck])
+        self.index.db.execute("PRAGMA user_version = 1")
+        self.index.close()
+
+        self.index = DeckIndex(self.index_path)
+        self.assertEqual(self.index.search("decision coral"), [])
+        self.assertEqual(self.index.update([deck]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Checks for image_source.py against an in-process stand-in for S3: ETag
+revalidation, the timeout fallback chain and access errors.
+
+Usage:
+    python -m pytest -q test_image_source.py
+"""
+
+from contextlib import redirect_stderr
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from image_source import S3AccessError, S3ImageSource
+
+BUCKET = "fitcheck-images"
+PREFIX = "pitch-materials/extracted_images/"
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """GET-only bucket: server.objects {key: bytes}, server.slow / server.denied key sets."""
+
+    def do_GET(self):
+        server = self.server
+        key = self.path[len(f"/{BUCKET}/"):]
+        server.requests.append((key, dict(self.headers)))
+        if key in server.denied:
+            return self._reply(403)
+        if key in server.slow:
+            time.sleep(server.slow_seconds)
+        if key not in server.objects:
+            return self._reply(404)
+        etag = f'"{len(server.objects[key])}-{key}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._reply(304, headers={"ETag": etag})
+        self._reply(200, server.objects[key], {"ETag": etag})
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class S3ImageSourceTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+        cls.server.daemon_threads = True
+        cls.endpoint = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.objects = {PREFIX + "a.jpg": b"image a", PREFIX + "b.jpg": b"image b"}
+        self.server.slow, self.server.denied = set(), set()
+        self.server.slow_seconds = 1.0
+        self.server.requests = []
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self._tmp.name, "cache")
+        self.local_dir = os.path.join(self._tmp.name, "local")
+        os.makedirs(self.local_dir)
+        self.sources = []
+
+    def tearDown(self):
+        for source in self.sources:
+            source.close()
+        self._tmp.cleanup()
+
+    def source(self, **kwargs):
+        kwargs.setdefault("timeout", 5.0)
+        source = S3ImageSource(BUCKET, self.cache_dir, endpoint=self.endpoint, prefix=PREFIX,
+                               fallback_dir=self.local_dir, **kwargs)
+        self.sources.append(source)
+        return source
+
+    def test_fetch_then_revalidate_with_etag(self):
+        path = self.source().prefetch(["a.jpg"])["a.jpg"]
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"image a")
+
+        # A new build revalidates the cached copy instead of downloading it
+        self.assertEqual(self.source().prefetch(["a.jpg"]), {"a.jpg": path})
+        (_, first), (_, second) = self.server.requests
+        self.assertNotIn("If-None-Match", first)
+        self.assertEqual(second["If-None-Match"], '"7-%sa.jpg"' % PREFIX)
+
+    def test_changed_object_is_downloaded_again(self):
+        self.source().prefetch(["a.jpg"])
+        self.server.objects[PREFIX + "a.jpg"] = b"image a, retouched"
+        path = self.source().prefetch(["a.jpg"])["a.jpg"]
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"image a, retouched")
+
+    def test_timeout_falls_back_to_cached_copy_then_local_file_then_placeholder(self):
+        cached = self.source().prefetch(["a.jpg"])["a.jpg"]
+        with open(os.path.join(self.local_dir, "b.jpg"), "wb") as f:
+            f.write(b"local b")
+        self.server.objects[PREFIX + "c.jpg"] = b"image c"
+        self.server.slow = {PREFIX + "a.jpg", PREFIX + "b.jpg", PREFIX + "c.jpg"}
+
+        with redirect_stderr(io.StringIO()) as err:
+            images = self.source(timeout=0.2).prefetch(["a.jpg", "b.jpg", "c.jpg"])
+        self.assertEqual(images, {"a.jpg": cached,
+                                  "b.jpg": os.path.join(self.local_dir, "b.jpg"),
+                                  "c.jpg": None})
+        self.assertIn("using cached copy", err.getvalue())
+        self.assertIn("using local file", err.getvalue())
+        self.assertIn("using placeholder", err.getvalue())
+
+    def test_access_denied_raises(self):
+        self.server.denied = {PREFIX + "a.jpg"}
+        with self.assertRaises(S3AccessError):
+            self.source().prefetch(["a.jpg", "b.jpg"])
+
+    def test_repeated_prefetch_returns_every_requested_name(self):
+        source = self.source()
+        first = source.prefetch(["a.jpg"])
+        both = source.prefetch(["a.jpg", "b.jpg", "a.jpg"])
+        self.assertEqual(list(both), ["a.jpg", "b.jpg"])
+        self.assertEqual(both["a.jpg"], first["a.jpg"])
+        self.assertEqual(source.prefetch(["a.jpg", "b.jpg"]), both)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_session_token_is_sent_and_signed(self):
+        self.source(access_key="AKID", secret_key="secret", session_token="token").prefetch(["a.jpg"])
+        (_, headers), = self.server.requests
+        self.assertEqual(headers["x-amz-security-token"], "token")
+        self.assertIn("x-amz-security-token", headers["Authorization"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Checks for speaker_notes.py: a deck whose notes were patched into a cached
+deck must be byte-identical to a full rebuild with the same notes.
+
+Usage:
+    python -m pytest -q test_speaker_notes.py
+"""
+
+from contextlib import redirect_stdout
+import filecmp
+import io
+import os
+import tempfile
+import unittest
+
+import create_pitch_deck
+from create_pitch_deck import NOTES_PATH, build_deck
+from speaker_notes import parse_speaker_notes
+
+
+class SpeakerNotesTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        # Keep the tests' decks out of the real deck cache
+        self._deck_cache_dir = create_pitch_deck.DECK_CACHE_DIR
+        create_pitch_deck.DECK_CACHE_DIR = os.path.join(self.tmp, "decks")
+
+    def tearDown(self):
+        create_pitch_deck.DECK_CACHE_DIR = self._deck_cache_dir
+        self._tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def build(self, name, **kwargs):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            build_deck(self.path(name), **kwargs)
+        return out.getvalue()
+
+    def test_parse_speaker_notes(self):
+        notes = parse_speaker_notes(
+            "# Notes\n\nPreamble.\n\n## Slide 1: Title\n\n> \"Hello **there**.\n>\n"
+            "> Second *line*.\"\n\n---\n\n## Slide 2: Empty\n\n## Slide 3: Ask\n\nAsk.\n")
+        self.assertEqual(notes, {"Title": "\"Hello there.\nSecond line.\"", "Ask": "Ask."})
+
+    def test_notes_patch_matches_rebuild(self):
+        with open(NOTES_PATH, encoding="utf-8") as f:
+            notes = f.read()
+        edited = self.path("Speaker_Notes.md")
+        with open(edited, "w", encoding="utf-8") as f:
+            f.write(notes.replace("Friends are biased.", "Friends are always biased.", 1))
+
+        self.build("original.pptx")
+        log = self.build("patched.pptx", notes_path=edited)
+        self.assertIn("1 notes updated", log)
+        self.build("rebuilt.pptx", notes_path=edited, use_cache=False)
+        self.assertTrue(filecmp.cmp(self.path("patched.pptx"), self.path("rebuilt.pptx"),
+                                    shallow=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
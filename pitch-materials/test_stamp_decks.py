@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Checks for stamp_decks.py: a stamped copy must be a valid zip holding what
+a full build for that recipient would have written.
+
+Usage:
+    python -m pytest -q test_stamp_decks.py
+"""
+
+from contextlib import redirect_stdout
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+
+import create_pitch_deck
+from create_pitch_deck import build_deck
+from stamp_decks import StampTemplate, build_stamp_master, stamp_decks
+
+
+def _members(path):
+    with zipfile.ZipFile(path) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+class StampDecksTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.tmp = cls._tmp.name
+        # Keep the tests' decks out of the real deck cache
+        cls._deck_cache_dir = create_pitch_deck.DECK_CACHE_DIR
+        create_pitch_deck.DECK_CACHE_DIR = os.path.join(cls.tmp, "decks")
+        with redirect_stdout(io.StringIO()):
+            cls.template = StampTemplate(build_stamp_master(os.path.join(cls.tmp, "master.pptx")))
+
+    @classmethod
+    def tearDownClass(cls):
+        create_pitch_deck.DECK_CACHE_DIR = cls._deck_cache_dir
+        cls._tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def test_stamped_copy_is_a_valid_zip(self):
+        stamped = self.template.stamp_to(self.path("stamped.pptx"), "Jane Doe")
+        with zipfile.ZipFile(stamped) as zf:
+            self.assertIsNone(zf.testzip())
+
+    def test_stamped_copy_matches_full_build(self):
+        recipient, tracking = "Jane & Partners <Fund II>", "JP-0042"
+        stamped = self.template.stamp_to(self.path("stamped_jp.pptx"), recipient, tracking)
+        with redirect_stdout(io.StringIO()):
+            build_deck(self.path("full_jp.pptx"), recipient=recipient, tracking=tracking,
+                       use_cache=False)
+        self.assertEqual(_members(stamped), _members(self.path("full_jp.pptx")))
+
+    def test_colliding_filenames_are_rejected(self):
+        out_dir = self.path("colliding")
+        with self.assertRaises(ValueError):
+            stamp_decks([("A&B", "X"), ("A_B", "x")], out_dir, template=self.template)
+        self.assertFalse(os.path.exists(out_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()